@@ -0,0 +1,8 @@
+'''
+Script kept so `python batch.py` keeps working from a checkout -- streams equity queries from a file or standard input
+(see holdem/batch.py)
+'''
+from holdem.batch import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+'''
+Script kept so `python benchmark.py` keeps working from a checkout -- benchmarks and checks the hand evaluators and
+equity engines (see holdem/benchmark.py)
+'''
+import sys
+
+from holdem.benchmark import main
+
+if __name__ == '__main__':
+    sys.exit(main())
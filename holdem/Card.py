@@ -10,12 +10,15 @@ class Card:
     Methods:
         __init__ -- constructor
         __eq__ -- determines if 2 cards are of equal value and suit
+        __hash__ -- hashes card by value and suit, so equal cards can be used as the same dict key
         __str__ -- provides user-friendly string representation of card
         __repr__ -- provides developer-friendly string representation of card
     '''
     VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14]
     SUITS = ['D', 'C', 'H', 'S']
 
+    __slots__ = ('value', 'suit')
+
     def __init__(self, value, suit):
         self.value = value
         self.suit = suit 
@@ -23,6 +26,9 @@ class Card:
     def __eq__(self, other):
         return self.value == other.value and self.suit == other.suit
 
+    def __hash__(self):
+        return hash((self.value, self.suit))
+
     def __str__(self):
         if self.value == 14:
             value = 'A'
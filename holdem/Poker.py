@@ -1,7 +1,9 @@
-from Card import Card
+from .Card import Card
+from .card_codes import CARD_BITS, CARD_CODES, FULL_DECK_MASK, code_to_card, count_cards, mask_to_codes
 
 NUM_CARDS_PER_HAND= 2
 NUM_PLAYERS = 2
+COMMUNITY_SIZES = [0, 3, 4, 5] # preflop, flop, turn, river
 
 class Poker:
     '''
@@ -9,19 +11,21 @@ class Poker:
         Represents a game of Poker/TexasHoldEm.
     
     Attributes:
-        deck -- list of cards in deck
+        deck_mask -- 52 bit mask of the cards in deck (see card_codes.py)
+        deck -- list of cards in deck (built from deck_mask)
         hand_limit -- number of cards allowed in hand (default is 2)
         num_in_community -- number of cards already revealed in community / table (default is 0)
         num_players -- number of players in game (default is 2)
     
     Methods: 
         __init__ -- constructor
-            creates deck object and fills deck with 52 Card objects
+            creates a full deck of 52 cards
+        has_card -- determines if the specified card is in the deck
         remove_card -- removes specified card from the deck
             raises ValueError if card to remove is not in the deck
         set_num_in_community -- sets the number of cards already in the community/table
         get_num_in_community -- gets input for the number of cards already in the community/table
-            raises ValueError for invalid input (only 3 and 4 allowed for downstream probability calculations)
+            raises ValueError for invalid input (only 0, 3, 4 and 5 allowed)
         input_cards -- provides player cards/table cards based on input and removes correspoding cards from deck
             raises ValueErrors whenever input results in a card not in the deck
         count_remaining -- determines how many cards are left in the deck
@@ -29,19 +33,23 @@ class Poker:
     '''
 
     def __init__(self):
-        self.deck = []
-        for suit in Card.SUITS:
-            for value in Card.VALUES:
-                card = Card(value, suit)
-                self.deck.append(card)
+        self.deck_mask = FULL_DECK_MASK
 
         self.hand_limit = NUM_CARDS_PER_HAND
         self.num_in_community = 0 
         self.num_players = NUM_PLAYERS
     
+    @property
+    def deck(self):
+        return [code_to_card(code) for code in mask_to_codes(self.deck_mask)]
+
+    def has_card(self, card):
+        code = CARD_CODES.get((card.value, card.suit))
+        return code is not None and self.deck_mask & CARD_BITS[code] != 0
+
     def remove_card(self, card):
-        if card in self.deck:
-            self.deck.remove(card)
+        if self.has_card(card):
+            self.deck_mask &= ~CARD_BITS[CARD_CODES[(card.value, card.suit)]]
         else:
             raise ValueError('Card to remove not found in deck')
 
@@ -53,10 +61,10 @@ class Poker:
         num_in_community = input('Enter number of cards in community: ')
         if num_in_community.isdigit():
             num_in_community = int(num_in_community)
-        if num_in_community == 3 or num_in_community == 4:
+        if num_in_community in COMMUNITY_SIZES:
             return num_in_community
         else: 
-            raise ValueError('Invalid number of cards in community - please only enter 3 or 4')
+            raise ValueError('Invalid number of cards in community - please only enter 0, 3, 4 or 5')
     
     def input_cards(self):
         hands = [[] for _ in range(self.num_players)]
@@ -70,7 +78,7 @@ class Poker:
                     card_value = input(f'Please enter valid value (2 to 14): ')
                 card_suit = input(f'Enter player {i+1} card {j+1} suit: ')
                 card = Card(int(card_value), card_suit)
-                if card in self.deck:
+                if self.has_card(card):
                     hands[i].append(card)
                     self.remove_card(card)
                 else:
@@ -82,7 +90,7 @@ class Poker:
             card_value = input(f'Enter card {i+1} value on the table: ')
             card_suit = input(f'Enter card {i+1} suit on the table: ')
             card = Card(int(card_value), card_suit)
-            if card in self.deck:
+            if self.has_card(card):
                 community.append(card)
                 self.remove_card(card)
             else:
@@ -91,7 +99,7 @@ class Poker:
         return hands, community
     
     def count_remaining(self):
-        return len(self.deck)
+        return count_cards(self.deck_mask)
     
     def display_deck(self):
         for card in self.deck:
@@ -0,0 +1,48 @@
+'''
+Library API of the odds calculator -- every public function is importable from the package, e.g.
+
+    from holdem import equity, parse_cards
+    equity([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'))
+
+Each name is only imported from its module (holdem.probabilities, holdem.ranges, ...) on first use, so importing
+the package is instant and the heavier pieces (NumPy, the lookup tables, the worker pool) cost nothing unless they
+are used.
+'''
+import importlib
+
+# public name -> module of the package defining it
+API = {
+    'parse_card': 'card_codes', 'parse_cards': 'card_codes',
+    'equity': 'probabilities', 'equity_by_card': 'probabilities', 'equity_outs': 'probabilities',
+    'get_outs': 'probabilities', 'equity_threshold': 'probabilities', 'equity_monte_carlo': 'probabilities',
+    'RANK_NAMES': 'hand_functions',
+    'cached_equity': 'equity_cache', 'EquityCache': 'equity_cache',
+    'EquityCounts': 'equity_counts', 'count_shard': 'equity_counts', 'get_spot_shards': 'equity_counts',
+    'merge_counts': 'equity_counts',
+    'parse_range': 'ranges', 'range_equity': 'ranges', 'count_range_runouts': 'ranges',
+    'get_range_shards': 'ranges',
+    'equity_parallel': 'parallel', 'shutdown_pool': 'parallel',
+    'equity_vectorized': 'vectorized',
+    'lookup_equity': 'preflop_table', 'lookup_class_equity': 'preflop_table',
+    'equity_trajectory': 'trajectory', 'equity_trajectories': 'trajectory',
+    'ResultStore': 'result_store', 'use_store': 'result_store', 'stop_using_store': 'result_store',
+}
+
+__all__ = sorted(API)
+
+def __getattr__(name):
+    '''
+    function -- __getattr__
+        imports a public name from its module the first time it is used
+    parameters: name -- name being looked up
+    returns the object
+    raises AttributeError if the name is not part of the API
+    '''
+    if name not in API:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module('.' + API[name], __name__), name)
+    globals()[name] = value # later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(API))
@@ -0,0 +1,120 @@
+import argparse
+import json
+import sys
+
+from .card_codes import parse_cards
+from .equity_cache import cached_equity
+from . import result_store
+
+TASKS_PER_WORKER = 4 # queries in flight per worker, bounds memory however long the input is
+
+def parse_query(line):
+    '''
+    function -- parse query
+        parses one equity query, either as JSON such as {"id": 1, "hands": ["AhKh", "QsQd"], "board": "2h7h9c"}
+        (with optional "dead" cards) or as compact text such as 'AhKh QsQd | 2h7h9c | 5c' (board and dead optional)
+    parameters: line -- text of the query
+    returns the query id (None if not given), the list of hands, the board and the dead cards
+    raises ValueError if the query cannot be parsed
+    '''
+    line = line.strip()
+    if line.startswith('{'):
+        query = json.loads(line)
+        hands = [parse_text_cards(hand) for hand in query.get('hands', [])]
+        return (query.get('id'), hands, parse_text_cards(query.get('board', '')),
+                parse_text_cards(query.get('dead', '')))
+
+    sections = [section.strip() for section in line.split('|')]
+    if len(sections) > 3:
+        raise ValueError(f'Invalid query - expected "hands | board | dead": {line}')
+    sections += [''] * (3 - len(sections))
+    hands = [parse_cards(hand) for hand in sections[0].split()]
+    return None, hands, parse_cards(sections[1]), parse_cards(sections[2])
+
+def parse_text_cards(cards):
+    '''
+    function -- parse text cards
+        parses cards given either as one string ('AhKh') or as a list of card strings (['Ah', 'Kh'])
+    parameters: cards -- string or list of strings
+    returns the list of Card objects
+    raises ValueError if any card is invalid
+    '''
+    if isinstance(cards, str):
+        return parse_cards(cards)
+    return [card for text in cards for card in parse_cards(text)]
+
+def run_query(line, line_number=None):
+    '''
+    function -- run query
+        parses and computes one equity query (repeated spots are served from this process's cache)
+    parameters: line -- text of the query
+                line_number -- position of the query in the input, used as its id if it has none
+    returns the result as one line of JSON -- the id with each player's win, tie and equity, or the error
+    '''
+    query_id = line_number
+    try:
+        parsed_id, hands, board, dead = parse_query(line)
+        if parsed_id is not None:
+            query_id = parsed_id
+        results = cached_equity(hands, board, dead)
+    except (ValueError, TypeError, AttributeError) as ex:
+        return json.dumps({'id': query_id, 'error': str(ex)})
+
+    return json.dumps({'id': query_id,
+                       'win': [win for win, _, _ in results],
+                       'tie': [tie for _, tie, _ in results],
+                       'equity': [player_equity for _, _, player_equity in results]})
+
+def run_batch(lines, workers=None):
+    '''
+    function -- run batch
+        computes a stream of queries, yielding each result as soon as it and every query before it are done
+        only a few queries per worker are in flight at a time, so the input can be arbitrarily long
+    parameters: lines -- iterable of query lines (blank lines and lines starting with # are skipped)
+                workers -- number of worker processes (default or 1 computes in this process)
+    returns a generator of result lines, in input order
+    '''
+    queries = ((line, line_number) for line_number, line in enumerate(lines, 1)
+               if line.strip() and not line.lstrip().startswith('#'))
+
+    if workers is None or workers <= 1:
+        for line, line_number in queries:
+            yield run_query(line, line_number)
+        return
+
+    from .parallel import map_in_order
+    yield from map_in_order(run_query, queries, workers, TASKS_PER_WORKER)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute equities for a stream of queries, one per line.')
+    parser.add_argument('input', nargs='?', default='-', help='query file (default is standard input)')
+    parser.add_argument('-o', '--output', default='-', help='result file (default is standard output)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--store', default=None, help='persistent result store (SQLite file) to read and fill')
+    parser.add_argument('--warm', action='store_true',
+                        help='only fill the store with the results of the input queries, writing no results')
+    args = parser.parse_args(argv)
+
+    if args.store:
+        result_store.use_store(args.store)
+    elif args.warm:
+        parser.error('--warm needs --store')
+
+    input_file = sys.stdin if args.input == '-' else open(args.input)
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.warm:
+            added = result_store.default_store.warm(input_file, args.workers)
+            print(f'{added} results added to {args.store}', file=sys.stderr)
+            return
+        for result in run_batch(input_file, args.workers):
+            output_file.write(result + '\n')
+            output_file.flush()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+if __name__ == '__main__':
+    main()
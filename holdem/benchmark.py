@@ -0,0 +1,401 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import combinations
+
+from .card_codes import cards_to_mask, code_to_card
+from .hand_functions import (evaluate_mask, get_best_hand_rank, get_best_hand_strength, get_hand_combinations,
+                             get_hand_strength, get_rank_from_strength)
+from .Poker import Poker
+from .probabilities import (SPLIT_SCALE, count_runouts, count_runouts_by_card, count_total_runouts, equity,
+                            get_spot_masks, prob_river_unknown, prob_turn_and_river_unknown)
+
+DEFAULT_SEED = 2024
+NUM_EVALUATIONS = 20000 # hands per evaluator benchmark
+NUM_SPOTS = 5 # spots per equity benchmark
+DEFAULT_CHECKS = 2000
+COLD_START_RUNS = 5
+COLD_START_TARGET = 0.05 # seconds a fresh process may spend importing and answering one query, beyond Python itself
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # where `import holdem` finds this copy
+COLD_START_QUERY = ('from holdem import equity, parse_cards; '
+                    "equity([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c4d'))")
+
+def deal_spot(rng, num_players, num_board):
+    '''
+    function -- deal spot
+        deals random hole cards and board cards
+    parameters: rng -- random.Random to deal with
+                num_players -- number of hands to deal
+                num_board -- number of board cards to deal
+    returns the list of hands and the board, as lists of Card objects
+    '''
+    codes = rng.sample(range(52), 2 * num_players + num_board)
+    cards = [code_to_card(code) for code in codes]
+    hands = [cards[2 * i:2 * i + 2] for i in range(num_players)]
+    return hands, cards[2 * num_players:]
+
+def time_calls(function, arguments):
+    '''
+    function -- time calls
+        calls a function once per argument tuple and measures the total time
+    parameters: function -- function to time
+                arguments -- list of argument tuples
+    returns the total time in seconds
+    '''
+    start = time.perf_counter()
+    for args in arguments:
+        function(*args)
+    return time.perf_counter() - start
+
+def count_collections(function, arguments):
+    '''
+    function -- count collections
+        calls a function once per argument tuple and counts the garbage collections it causes
+        (a collection runs whenever enough containers are allocated and not yet freed, so this measures churn)
+    parameters: function -- function to call
+                arguments -- list of argument tuples
+    returns the number of collections of all generations
+    '''
+    before = sum(stats['collections'] for stats in gc.get_stats())
+    for args in arguments:
+        function(*args)
+    return sum(stats['collections'] for stats in gc.get_stats()) - before
+
+def measure_peak_memory(function, args):
+    '''
+    function -- measure peak memory
+        calls a function once and traces the memory it allocates
+    parameters: function -- function to call
+                args -- argument tuple
+    returns the peak memory allocated during the call, in bytes, and the memory it left allocated
+    '''
+    tracemalloc.start()
+    try:
+        function(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, current
+
+def benchmark_evaluators(rng):
+    '''
+    function -- benchmark evaluators
+        times every hand evaluator on the same seeded hands
+    parameters: rng -- random.Random to deal with
+    returns a list of result dicts (name, hands, seconds, hands per second)
+    '''
+    deck = [code_to_card(code) for code in range(52)]
+    five_card_hands = [(rng.sample(deck, 5),) for _ in range(NUM_EVALUATIONS)]
+    seven_card_hands = [rng.sample(deck, 7) for _ in range(NUM_EVALUATIONS)]
+    seven_card_masks = [(sum(1 << code for code in rng.sample(range(52), 7)),) for _ in range(NUM_EVALUATIONS)]
+
+    evaluators = [('get_best_hand_rank (5 cards)', get_best_hand_rank, five_card_hands),
+                  ('get_hand_strength (5 cards)', get_hand_strength, five_card_hands),
+                  ('best of 21 get_hand_strength (7 cards)', reference_strength,
+                   [(hand,) for hand in seven_card_hands]),
+                  ('get_best_hand_strength (7 cards)', get_best_hand_strength,
+                   [(hand[:2], hand[2:]) for hand in seven_card_hands]),
+                  ('evaluate_mask (7 cards)', evaluate_mask, seven_card_masks)]
+
+    from . import lookup_table
+    if lookup_table.get_table() is not None:
+        evaluators.append(('lookup_table.evaluate_mask_from_table (7 cards)',
+                           lookup_table.evaluate_mask_from_table, seven_card_masks))
+
+    results = []
+    for name, function, arguments in evaluators:
+        seconds = time_calls(function, arguments)
+        results.append({'name': name, 'hands': len(arguments), 'seconds': seconds,
+                        'hands_per_second': len(arguments) / seconds})
+
+    vectorized = get_vectorized()
+    if vectorized is not None:
+        import numpy as np
+        suit_masks = [np.array([mask >> (13 * suit) & 0x1FFF for (mask,) in seven_card_masks], dtype=np.int64)
+                      for suit in range(4)]
+        start = time.perf_counter()
+        vectorized.evaluate_suit_mask_arrays(*suit_masks)
+        seconds = time.perf_counter() - start
+        results.append({'name': 'vectorized.evaluate_suit_mask_arrays (7 cards)', 'hands': NUM_EVALUATIONS,
+                        'seconds': seconds, 'hands_per_second': NUM_EVALUATIONS / seconds})
+    return results
+
+def benchmark_equity(rng, include_preflop=False, workers=None):
+    '''
+    function -- benchmark equity
+        times the equity functions on the same seeded spots
+    parameters: rng -- random.Random to deal with
+                include_preflop -- also time heads-up preflop spots (1.7M runouts each)
+                workers -- number of worker processes for the parallel engine (None to skip it)
+    returns a list of result dicts (name, runouts, seconds, runouts per second, garbage collections during the
+            timed calls, and the peak and retained memory of one call in bytes)
+    '''
+    streets = [('river unknown', 4), ('turn and river unknown', 3)]
+    if include_preflop:
+        streets.append(('preflop', 0))
+
+    results = []
+    for street, num_board in streets:
+        spots = [deal_spot(rng, 2, num_board) for _ in range(NUM_SPOTS)]
+        num_runouts = sum(count_spot_runouts(hands, board) for hands, board in spots)
+
+        engines = [('equity', lambda hands, board: equity(hands, board))]
+        if num_board == 4:
+            engines.append(('prob_river_unknown', legacy_probability(prob_river_unknown)))
+        if num_board == 3:
+            engines.append(('prob_turn_and_river_unknown', legacy_probability(prob_turn_and_river_unknown)))
+        if num_board >= 3:
+            engines.append(('equity_by_card', lambda hands, board: count_runouts_by_card(
+                *get_spot_masks(hands, board, ()))))
+        if get_vectorized() is not None:
+            engines.append(('equity_vectorized', lambda hands, board: get_vectorized().equity_vectorized(hands, board)))
+        if workers:
+            from .parallel import equity_parallel, get_pool
+            get_pool(workers)
+            engines.append(('equity_parallel', lambda hands, board: equity_parallel(hands, board, workers=workers)))
+
+        for name, function in engines:
+            seconds = time_calls(function, spots)
+            collections = count_collections(function, spots)
+            peak_bytes, retained_bytes = measure_peak_memory(function, spots[0])
+            results.append({'name': f'{name} ({street})', 'runouts': num_runouts, 'seconds': seconds,
+                            'runouts_per_second': num_runouts / seconds, 'gc_collections': collections,
+                            'peak_bytes': peak_bytes, 'retained_bytes': retained_bytes})
+    return results
+
+def count_spot_runouts(hands, board):
+    '''
+    function -- count spot runouts
+        determines how many runouts a spot has
+    parameters: hands -- list of each player's hole cards
+                board -- list of cards on the table
+    returns the number of runouts
+    '''
+    _, board_mask, live_mask = get_spot_masks(hands, board, ())
+    return count_total_runouts(board_mask, live_mask)
+
+def legacy_probability(function):
+    '''
+    function -- legacy probability
+        adapts prob_river_unknown / prob_turn_and_river_unknown to take (hands, board) like the other engines
+    parameters: function -- the probability function
+    returns the adapted function
+    '''
+    def run(hands, board):
+        game = Poker()
+        for card in hands[0] + hands[1] + board:
+            game.remove_card(card)
+        return function(hands[0], hands[1], list(board), game)
+    return run
+
+def get_vectorized():
+    '''
+    function -- get vectorized
+        imports the NumPy backend if NumPy is installed
+    parameters: none
+    returns the vectorized module, or None if NumPy is not installed
+    '''
+    try:
+        from . import vectorized
+        vectorized.get_tables()
+        return vectorized
+    except ImportError:
+        return None
+
+def reference_strength(cards):
+    '''
+    function -- reference strength
+        reference 7 card evaluation -- the best get_hand_strength of every 5 card combination
+    parameters: cards -- list of 5 to 7 cards
+    returns the packed strength (int)
+    '''
+    return max(get_hand_strength(hand) for hand in get_hand_combinations(cards, []))
+
+def reference_counts(hands, board):
+    '''
+    function -- reference counts
+        reference enumeration of a spot -- every runout dealt from a Card list and every hand ranked with
+        reference_strength
+    parameters: hands -- list of each player's hole cards
+                board -- list of cards on the table
+    returns lists of each player's wins, ties and pot shares, and the number of runouts
+    '''
+    used = [card for hand in hands for card in hand] + list(board)
+    deck = [code_to_card(code) for code in range(52) if code_to_card(code) not in used]
+    wins = [0] * len(hands)
+    ties = [0] * len(hands)
+    shares = [0] * len(hands)
+    total = 0
+    for runout in combinations(deck, 5 - len(board)):
+        strengths = [reference_strength(hand + list(board) + list(runout)) for hand in hands]
+        best = max(strengths)
+        winners = [i for i, strength in enumerate(strengths) if strength == best]
+        for i in winners:
+            if len(winners) == 1:
+                wins[i] += 1
+            else:
+                ties[i] += 1
+            shares[i] += SPLIT_SCALE // len(winners)
+        total += 1
+    return wins, ties, shares, total
+
+def check_correctness(rng, num_checks=DEFAULT_CHECKS, workers=None):
+    '''
+    function -- check correctness
+        correctness oracle -- checks every fast path against the reference implementation on a random corpus:
+        hand ranks against get_best_hand_rank, 7 card evaluators against the best of the 21 combinations, and
+        the equity engines against a plain enumeration with the reference evaluator
+    parameters: rng -- random.Random to deal with
+                num_checks -- number of random hands to check each evaluator on (spots are a fraction of this)
+                workers -- number of worker processes to also check the parallel engine with (None to skip it)
+    returns a list of mismatch descriptions (empty if everything agrees)
+    '''
+    mismatches = []
+    deck = [code_to_card(code) for code in range(52)]
+
+    from . import lookup_table
+    table_available = lookup_table.get_table() is not None
+    vectorized = get_vectorized()
+
+    for _ in range(num_checks):
+        hand = rng.sample(deck, 5)
+        if get_rank_from_strength(get_hand_strength(hand)) != get_best_hand_rank(hand):
+            mismatches.append(f'get_hand_strength rank differs from get_best_hand_rank for {hand}')
+
+        cards = rng.sample(deck, rng.randint(5, 7))
+        expected = reference_strength(cards)
+        mask = cards_to_mask(cards)
+        found = {'get_best_hand_strength': get_best_hand_strength(cards[:2], cards[2:]),
+                 'evaluate_mask': evaluate_mask(mask)}
+        if table_available:
+            found['lookup_table'] = lookup_table.evaluate_mask_from_table(mask)
+        if vectorized is not None:
+            import numpy as np
+            suit_masks = [np.array([mask >> (13 * suit) & 0x1FFF], dtype=np.int64) for suit in range(4)]
+            found['vectorized'] = int(vectorized.evaluate_suit_mask_arrays(*suit_masks)[0])
+        for name, strength in found.items():
+            if strength != expected:
+                mismatches.append(f'{name} gives {strength:#x} instead of {expected:#x} for {cards}')
+
+    for _ in range(max(1, num_checks // 200)):
+        num_players = rng.randint(2, 4)
+        hands, board = deal_spot(rng, num_players, rng.choice([3, 4, 5]))
+        expected = reference_counts(hands, board)
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, ())
+        found = {'count_runouts': count_runouts(hand_masks, board_mask, live_mask)}
+        if len(board) < 5:
+            found['count_runouts_by_card'] = tuple(count_runouts_by_card(hand_masks, board_mask, live_mask)[0])
+        if vectorized is not None:
+            found['vectorized'] = vectorized.count_runouts_vectorized(hand_masks, board_mask, live_mask)
+        if workers:
+            from .parallel import count_runouts_parallel
+            found['parallel'] = count_runouts_parallel(hand_masks, board_mask, live_mask, workers)
+        for name, counts in found.items():
+            if tuple(counts) != tuple(expected):
+                mismatches.append(f'{name} gives {counts} instead of {expected} for {hands} on {board}')
+
+    return mismatches
+
+def measure_cold_start(runs=COLD_START_RUNS):
+    '''
+    function -- measure cold start
+        times fresh Python processes answering one river query through the library API, against fresh processes
+        that do nothing, so the difference is the import and setup cost a short-lived caller pays
+    parameters: runs -- number of processes of each kind (the fastest is kept, to leave out system noise)
+    returns a result dict (seconds for the query process, seconds for the empty process, and their difference)
+    '''
+    def fastest(code):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], check=True, cwd=PACKAGE_PARENT)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    query_seconds = fastest(COLD_START_QUERY)
+    empty_seconds = fastest('pass')
+    return {'query_seconds': query_seconds, 'interpreter_seconds': empty_seconds,
+            'startup_seconds': query_seconds - empty_seconds, 'target_seconds': COLD_START_TARGET}
+
+def get_commit():
+    '''
+    function -- get commit
+        identifies the commit being benchmarked
+    parameters: none
+    returns the current git commit hash, or None if it cannot be determined
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_results(results, baseline):
+    '''
+    function -- compare results
+        prints how each benchmark's throughput changed against a previous result file
+    parameters: results -- benchmark results of this run
+                baseline -- benchmark results loaded from a previous run
+    returns nothing
+    '''
+    baseline_speeds = {result['name'] : result for result in baseline['benchmarks']}
+    print('\nCompared to', baseline.get('commit') or 'baseline')
+    for result in results['benchmarks']:
+        previous = baseline_speeds.get(result['name'])
+        if previous is None:
+            continue
+        key = 'hands_per_second' if 'hands_per_second' in result else 'runouts_per_second'
+        print(f'{result["name"]:<60} {result[key] / previous[key]:6.2f}x')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark and check the hand evaluators and equity engines.')
+    parser.add_argument('-o', '--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--compare', default=None, help='previous JSON result file to compare against')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='seed for the benchmark scenarios')
+    parser.add_argument('--preflop', action='store_true', help='also benchmark heads-up preflop spots')
+    parser.add_argument('--workers', type=int, default=None, help='also benchmark the parallel engine')
+    parser.add_argument('--check', type=int, default=DEFAULT_CHECKS, help='random hands for the oracle (0 to skip)')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = {'commit': get_commit(), 'python': platform.python_version(), 'seed': args.seed,
+               'benchmarks': benchmark_evaluators(rng) + benchmark_equity(rng, args.preflop, args.workers)}
+
+    for result in results['benchmarks']:
+        if 'hands_per_second' in result:
+            print(f'{result["name"]:<60} {result["hands_per_second"]:>12,.0f} hands/sec')
+        else:
+            print(f'{result["name"]:<60} {result["runouts_per_second"]:>12,.0f} runouts/sec'
+                  f' {result["peak_bytes"] / 1024:>10,.1f} KiB peak {result["gc_collections"]:>5} collections')
+
+    cold_start = measure_cold_start()
+    results['cold_start'] = cold_start
+    exceeded = ', exceeded' if cold_start['startup_seconds'] > COLD_START_TARGET else ''
+    print(f'\nCold start of a one-shot query: {cold_start["startup_seconds"] * 1000:.0f} ms beyond interpreter '
+          f'startup (target {COLD_START_TARGET * 1000:.0f} ms{exceeded})')
+
+    if args.check:
+        mismatches = check_correctness(random.Random(args.seed), args.check, args.workers)
+        results['mismatches'] = mismatches
+        print(f'\nCorrectness oracle: {len(mismatches)} mismatches')
+        for mismatch in mismatches[:20]:
+            print('  ' + mismatch)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare_results(results, json.load(baseline_file))
+
+    return 1 if results.get('mismatches') else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
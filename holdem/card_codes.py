@@ -0,0 +1,123 @@
+from .Card import Card
+
+# CARD CODES
+# code = suit index * 13 + (value - 2), so bits 13*s to 13*s + 12 of a card mask are the rank mask of suit s
+NUM_CARDS_IN_DECK = 52
+NUM_VALUES = len(Card.VALUES)
+FULL_DECK_MASK = (1 << NUM_CARDS_IN_DECK) - 1
+
+CARD_CODES = {(value, suit) : suit_index * NUM_VALUES + value_index
+              for suit_index, suit in enumerate(Card.SUITS)
+              for value_index, value in enumerate(Card.VALUES)}
+CODE_CARDS = {code : value_suit for value_suit, code in CARD_CODES.items()}
+CARD_BITS = [1 << code for code in range(NUM_CARDS_IN_DECK)]
+CARD_TEXT_VALUES = {'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+
+def card_to_code(card):
+    '''
+    function -- card to code
+        converts a Card object to its compact integer code
+    parameters: card -- Card object
+    returns the card code (int from 0 to 51)
+    raises ValueError if the card is not a valid playing card
+    '''
+    code = CARD_CODES.get((card.value, card.suit))
+    if code is None:
+        raise ValueError(f'Invalid card: {card}')
+    return code
+
+def code_to_card(code):
+    '''
+    function -- code to card
+        converts a compact integer code back to a Card object (for display)
+    parameters: code -- card code (int from 0 to 51)
+    returns the corresponding Card object
+    '''
+    value, suit = CODE_CARDS[code]
+    return Card(value, suit)
+
+def cards_to_mask(cards):
+    '''
+    function -- cards to mask
+        converts a list of cards to a 52 bit card mask
+    parameters: cards -- list of Card objects
+    returns the card mask (int) with the bit of every card set
+    raises ValueError if a card is invalid or appears more than once
+    '''
+    mask = 0
+    for card in cards:
+        bit = CARD_BITS[card_to_code(card)]
+        if mask & bit:
+            raise ValueError(f'Card appears more than once: {card}')
+        mask |= bit
+    return mask
+
+def mask_to_codes(mask):
+    '''
+    function -- mask to codes
+        lists the codes of all the cards in a card mask
+    parameters: mask -- card mask (int)
+    returns a list of card codes in increasing order
+    '''
+    codes = []
+    while mask:
+        lowest = mask & -mask
+        codes.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return codes
+
+def mask_to_bits(mask):
+    '''
+    function -- mask to bits
+        splits a card mask into the single-card masks of its cards
+    parameters: mask -- card mask (int)
+    returns a list of single-card masks in increasing card order
+    '''
+    return [CARD_BITS[code] for code in mask_to_codes(mask)]
+
+def count_cards(mask):
+    '''
+    function -- count cards
+        determines how many cards are in a card mask
+    parameters: mask -- card mask (int)
+    returns the number of cards (int)
+    '''
+    return bin(mask).count('1')
+
+def parse_card(text):
+    '''
+    function -- parse card
+        converts compact card text such as 'Ah', 'td' or '10S' to a Card object
+    parameters: text -- value (2 to 9, T or 10, J, Q, K, A) followed by suit (D, C, H, S), in either case
+    returns the corresponding Card object
+    raises ValueError if the text is not a valid card
+    '''
+    value_text = text[:-1].upper()
+    suit = text[-1:].upper()
+    value = CARD_TEXT_VALUES.get(value_text)
+    if value is None and value_text.isdigit():
+        value = int(value_text)
+    if (value, suit) not in CARD_CODES:
+        raise ValueError(f'Invalid card: {text}')
+    return Card(value, suit)
+
+def parse_cards(text):
+    '''
+    function -- parse cards
+        converts compact text of several cards such as 'AhKh', 'Ah Kh' or 'Ah,10h' to a list of Card objects
+    parameters: text -- cards written one after another, optionally separated by spaces or commas
+    returns the list of Card objects
+    raises ValueError if any card is invalid
+    '''
+    cards = []
+    card_text = ''
+    for char in text:
+        if char in ' ,':
+            continue
+        card_text += char
+        if char.upper() in Card.SUITS:
+            cards.append(parse_card(card_text))
+            card_text = ''
+    if card_text:
+        raise ValueError(f'Invalid card: {card_text}')
+    return cards
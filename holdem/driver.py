@@ -0,0 +1,20 @@
+from .Poker import Poker
+from .probabilities import display_probs, equity
+
+def main():
+    try: 
+        game = Poker()
+        game.set_num_in_community()
+        hands, community = game.input_cards()
+
+        results = equity(hands, community)
+        player_1, tie, _ = results[0]
+        player_2 = results[1][0]
+
+        display_probs(player_1, tie, player_2)
+
+    except ValueError as ex:
+        print(ex)
+
+if __name__ == '__main__':
+    main()
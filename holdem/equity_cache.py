@@ -0,0 +1,132 @@
+from collections import OrderedDict
+
+from . import instrumentation
+
+from .card_codes import NUM_VALUES, cards_to_mask
+from .hand_functions import ALL_RANKS_MASK
+from .probabilities import count_runouts, get_spot_masks, stored_equity
+
+NUM_SUITS = 4
+DEFAULT_MAXSIZE = 4096
+EVICTION_POLICIES = ['lru', 'fifo']
+
+def canonical_key(hand_masks, board_mask, dead_mask=0):
+    '''
+    function -- canonical key
+        maps a spot to a key that is the same for every relabelling of the suits
+        (e.g. AhKh vs QsQd on 2h7h9c and AsKs vs QhQd on 2s7s9c share a key), since such spots have the same equities
+    parameters: hand_masks -- list of each player's hole card mask (player order is kept)
+                board_mask -- mask of the cards on the table
+                dead_mask -- mask of known cards that are out of play
+    returns a hashable key (tuple of ints)
+    '''
+    masks = hand_masks + [board_mask, dead_mask]
+    # one column per suit: the rank mask that suit contributes to each hand, the board and the dead cards
+    columns = [tuple(mask >> (suit * NUM_VALUES) & ALL_RANKS_MASK for mask in masks) for suit in range(NUM_SUITS)]
+    columns.sort(reverse=True)
+    return (len(hand_masks),) + tuple(rank_mask for column in columns for rank_mask in column)
+
+def get_spot_key(hands, board=(), dead=()):
+    '''
+    function -- get spot key
+        canonical key of a spot given as cards (see canonical_key)
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+    returns a hashable key (tuple of ints)
+    raises ValueError if the spot is invalid
+    '''
+    hand_masks, board_mask, _ = get_spot_masks(hands, board, dead)
+    return canonical_key(hand_masks, board_mask, cards_to_mask(dead))
+
+class EquityCache:
+    '''
+    Class EquityCache
+        Represents a bounded in-memory cache of equity results keyed by canonical spot
+
+    Attributes:
+        maxsize -- maximum number of results kept (default is 4096)
+        eviction -- which result to drop when full, 'lru' (least recently used) or 'fifo' (oldest stored)
+        hits -- number of lookups that found a result
+        misses -- number of lookups that did not
+
+    Methods:
+        __init__ -- constructor
+            raises ValueError for an invalid size or eviction policy
+        get -- looks a result up, counting the hit or miss
+        put -- stores a result, evicting one if the cache is full
+        clear -- removes every result and resets the counters
+        stats -- provides the hit/miss counters and size
+        __len__ -- number of results currently stored
+    '''
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, eviction='lru'):
+        if maxsize < 1:
+            raise ValueError('Invalid cache size - please provide at least 1')
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f'Invalid eviction policy - please use one of {EVICTION_POLICIES}')
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def get(self, key):
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == 'lru':
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        if key in self._results:
+            self._results[key] = result
+            if self.eviction == 'lru':
+                self._results.move_to_end(key)
+            return
+        if len(self._results) >= self.maxsize:
+            self._results.popitem(last=False)
+        self._results[key] = result
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._results), 'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._results)
+
+default_cache = EquityCache()
+
+def cached_equity(hands, board=(), dead=(), cache=None, count_function=count_runouts):
+    '''
+    function -- cached equity
+        same as probabilities.equity, answered from the cache when the same spot (up to suits) was already computed
+        (then from the persistent store, if one is in use -- see result_store.use_store)
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                cache -- EquityCache to use (default is the module's shared cache)
+                count_function -- enumeration to run on a miss, e.g. count_runouts or
+                                  parallel.count_runouts_parallel (called with hand, board and live masks)
+    returns a list with, for each player, the probability of winning outright, the probability of splitting
+            the pot, and the player's equity
+    raises ValueError if the spot is invalid
+    '''
+    cache = default_cache if cache is None else cache
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    key = canonical_key(hand_masks, board_mask, cards_to_mask(dead))
+
+    result = cache.get(key)
+    if instrumentation.enabled:
+        instrumentation.record_cache(result is not None)
+    if result is None:
+        result = tuple(stored_equity(hand_masks, board_mask, live_mask, cards_to_mask(dead), count_function))
+        cache.put(key, result)
+    return list(result)
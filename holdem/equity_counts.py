@@ -0,0 +1,165 @@
+import json
+from fractions import Fraction
+
+from .card_codes import cards_to_mask
+from .probabilities import SPLIT_SCALE, count_runouts, count_total_runouts, get_equities, get_spot_masks
+
+class EquityCounts:
+    '''
+    Class EquityCounts
+        Represents the exact showdown counts of a spot over some of its runouts -- counts of separate shards of the
+        same spot (computed in any order, on any machine) add up to exactly the counts of the whole enumeration
+
+    Attributes:
+        wins -- list of each player's number of outright wins (or summed weights, for ranges)
+        ties -- list of each player's number of split pots
+        shares -- list of each player's pot shares, in 1/SPLIT_SCALE units
+        total -- number of runouts counted
+        key -- identifies the spot, so counts of different spots cannot be merged
+        runout_ranges -- sorted list of the (start, stop) runout index ranges counted
+        num_runouts -- number of runouts of the whole spot
+
+    Methods:
+        __init__ -- constructor
+        __add__ -- merges the counts of 2 shards of the same spot
+            raises ValueError if the spots differ or the shards overlap
+        __eq__ -- compares counts
+        losses -- list of each player's number of runouts lost
+        equities -- each player's exact equity (Fraction)
+        get_equities -- the same list of floats as probabilities.equity
+        is_complete -- whether every runout of the spot has been counted
+        to_dict / from_dict -- converts to and from a JSON-compatible dict
+        to_json / from_json -- converts to and from a JSON string
+    '''
+
+    def __init__(self, wins, ties, shares, total, key=None, runout_ranges=(), num_runouts=None):
+        self.wins = list(wins)
+        self.ties = list(ties)
+        self.shares = list(shares)
+        self.total = total
+        self.key = key
+        self.runout_ranges = [tuple(runout_range) for runout_range in runout_ranges]
+        self.num_runouts = num_runouts
+
+    def __add__(self, other):
+        if self.key != other.key or len(self.wins) != len(other.wins):
+            raise ValueError('Cannot merge the counts of different spots')
+        runout_ranges = merge_runout_ranges(self.runout_ranges + other.runout_ranges)
+        return EquityCounts([a + b for a, b in zip(self.wins, other.wins)],
+                            [a + b for a, b in zip(self.ties, other.ties)],
+                            [a + b for a, b in zip(self.shares, other.shares)],
+                            self.total + other.total, self.key, runout_ranges, self.num_runouts)
+
+    def __eq__(self, other):
+        return (isinstance(other, EquityCounts) and self.key == other.key and self.wins == other.wins
+                and self.ties == other.ties and self.shares == other.shares and self.total == other.total)
+
+    def losses(self):
+        return [self.total - win - tie for win, tie in zip(self.wins, self.ties)]
+
+    def equities(self):
+        return [Fraction(share, SPLIT_SCALE * self.total) for share in self.shares]
+
+    def get_equities(self):
+        return get_equities(self.wins, self.ties, self.shares, self.total)
+
+    def is_complete(self):
+        return self.runout_ranges == [(0, self.num_runouts)]
+
+    def to_dict(self):
+        return {'wins': self.wins, 'ties': self.ties, 'shares': self.shares, 'total': self.total,
+                'key': self.key, 'runout_ranges': self.runout_ranges, 'num_runouts': self.num_runouts}
+
+    @classmethod
+    def from_dict(cls, data):
+        key = data.get('key')
+        return cls(data['wins'], data['ties'], data['shares'], data['total'],
+                   tuple(key) if isinstance(key, list) else key,
+                   data.get('runout_ranges', ()), data.get('num_runouts'))
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+def merge_runout_ranges(runout_ranges):
+    '''
+    function -- merge runout ranges
+        sorts runout index ranges and joins the ones that touch
+    parameters: runout_ranges -- list of (start, stop) pairs
+    returns the sorted list of joined (start, stop) pairs
+    raises ValueError if any 2 ranges overlap (the same runouts would be counted twice)
+    '''
+    merged = []
+    for start, stop in sorted(runout_ranges):
+        if merged and start < merged[-1][1]:
+            raise ValueError(f'Cannot merge overlapping shards - runouts {start} to {merged[-1][1]} counted twice')
+        if merged and start == merged[-1][1]:
+            merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
+
+def merge_counts(counts):
+    '''
+    function -- merge counts
+        adds up the counts of any number of shards of the same spot
+    parameters: counts -- iterable of EquityCounts
+    returns the merged EquityCounts
+    raises ValueError if there are no counts, the spots differ or the shards overlap
+    '''
+    merged = None
+    for shard_counts in counts:
+        merged = shard_counts if merged is None else merged + shard_counts
+    if merged is None:
+        raise ValueError('No counts to merge')
+    return merged
+
+def get_spot_key(hand_masks, board_mask, dead_mask):
+    '''
+    function -- get spot key
+        identifies a spot exactly (unlike equity_cache.canonical_key, suits are not relabelled, since relabelling
+        changes the order the runouts are dealt in and so which runouts each shard holds)
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                dead_mask -- mask of known cards that are out of play
+    returns the key (tuple of ints)
+    '''
+    return tuple(hand_masks) + (board_mask, dead_mask)
+
+def count_shard(hands, board=(), dead=(), start=0, stop=None):
+    '''
+    function -- count shard
+        counts one shard of a spot's runouts exactly -- runouts are always dealt in the same order, so the shard
+        holds the same runouts whichever machine counts it
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                start -- index of the first runout to count
+                stop -- index after the last runout to count (None for all remaining runouts)
+    returns the EquityCounts of the shard
+    raises ValueError if the spot is invalid
+    '''
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    num_runouts = count_total_runouts(board_mask, live_mask)
+    stop = num_runouts if stop is None else min(stop, num_runouts)
+    wins, ties, shares, total = count_runouts(hand_masks, board_mask, live_mask, start, stop)
+    return EquityCounts(wins, ties, shares, total, get_spot_key(hand_masks, board_mask, cards_to_mask(dead)),
+                        [(start, stop)] if total else [], num_runouts)
+
+def get_spot_shards(hands, board=(), dead=(), num_shards=1):
+    '''
+    function -- get spot shards
+        splits a spot's runouts into shards of nearly equal size, to be counted separately with count_shard
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                num_shards -- number of shards
+    returns a list of (start, stop) runout index ranges covering every runout exactly once
+    raises ValueError if the spot is invalid
+    '''
+    from .parallel import get_shard_ranges
+    _, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    return get_shard_ranges(count_total_runouts(board_mask, live_mask), num_shards)
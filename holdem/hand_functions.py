@@ -12,6 +12,21 @@ TWO_PAIR = 2
 ONE_PAIR = 1
 HIGH_CARD = 0
 POKER_HAND_TOTAL = 5
+RANK_NAMES = ['High Card', 'One Pair', 'Two Pair', 'Three of a Kind', 'Straight', 'Flush', 'Full House',
+              'Four of a Kind', 'Straight Flush', 'Royal Flush'] # indexed by rank
+
+# HAND STRENGTH PACKING
+# strength = rank << RANK_SHIFT | up to 5 card values (4 bits each, most significant first)
+RANK_SHIFT = 20
+VALUE_BITS = 4
+
+# RANK MASKS
+# bit (value - 2) of a rank mask is set when a card of that value is present
+LOWEST_VALUE = 2
+NUM_VALUES = 13
+ALL_RANKS_MASK = (1 << NUM_VALUES) - 1
+WHEEL_MASK = 0b1000000001111 # A, 5, 4, 3, 2
+SUIT_INDEX = {'D': 0, 'C': 1, 'H': 2, 'S': 3}
 
 def has_pair(hand_count):
     '''
@@ -132,6 +147,83 @@ def get_best_hand_rank(hand):
     
     return HIGH_CARD
 
+def pack_strength(rank, values):
+    '''
+    function -- pack strength
+        packs a hand rank and its ordered deciding card values into one comparable integer
+    parameters: rank -- int poker ranking of the hand
+                values -- list of card values, most significant first (at most 5)
+    returns the packed hand strength (int) -- a higher strength always beats a lower one
+    '''
+    strength = rank
+    for i in range(POKER_HAND_TOTAL):
+        strength <<= VALUE_BITS
+        if i < len(values):
+            strength |= values[i]
+    return strength
+
+def get_rank_from_strength(strength):
+    '''
+    function -- get rank from strength
+        extracts the poker hand rank from a packed hand strength
+    parameters: strength -- packed hand strength (int)
+    returns the rank (int) of the hand
+    '''
+    return strength >> RANK_SHIFT
+
+def get_hand_strength(hand):
+    '''
+    function -- get hand strength
+        determines the strength of a 5 card hand as a single integer with the rank and all kickers packed in,
+        so comparing two hands is a single integer comparison (equal strengths are a tie)
+    parameters: hand -- list of the 5 cards in the hand
+    returns the packed hand strength (int)
+    '''
+    hand_values = sorted([card.value for card in hand], reverse=True)
+    hand_count = {}
+    for value in hand_values:
+        hand_count[value] = hand_count.get(value, 0) + 1
+
+    # deciding values are ordered by how many times they appear, then by value
+    ordered_values = sorted(hand_count, key=lambda value: (hand_count[value], value), reverse=True)
+    counts = [hand_count[value] for value in ordered_values]
+
+    straight_high = 0
+    if len(hand_count) == POKER_HAND_TOTAL:
+        if hand_values[0] - hand_values[-1] == 4:
+            straight_high = hand_values[0]
+        elif hand_values == [14, 5, 4, 3, 2]:
+            straight_high = 5
+
+    is_flush = len(set([card.suit for card in hand])) == 1
+
+    if is_flush and straight_high:
+        rank = ROYAL_FLUSH if straight_high == 14 else STRAIGHT_FLUSH
+        return pack_strength(rank, [straight_high])
+
+    elif counts[0] == 4:
+        return pack_strength(FOUR_OF_A_KIND, ordered_values)
+
+    elif counts[0] == 3 and counts[1] == 2:
+        return pack_strength(FULL_HOUSE, ordered_values)
+
+    elif is_flush:
+        return pack_strength(FLUSH, hand_values)
+
+    elif straight_high:
+        return pack_strength(STRAIGHT, [straight_high])
+
+    elif counts[0] == 3:
+        return pack_strength(THREE_OF_A_KIND, ordered_values)
+
+    elif counts[0] == 2 and counts[1] == 2:
+        return pack_strength(TWO_PAIR, ordered_values)
+
+    elif counts[0] == 2:
+        return pack_strength(ONE_PAIR, ordered_values)
+
+    return pack_strength(HIGH_CARD, hand_values)
+
 def get_high_card(hand, rank):
     '''
     function -- get high card
@@ -244,4 +336,119 @@ def break_tie(player_1_hand, player_2_hand, rank):
             hand_values_2.remove(highest_2)
             highest_2 = max(hand_values_2)
 
-    return winner
\ No newline at end of file
+    return winner
+
+def build_rank_mask_tables():
+    '''
+    function -- build rank mask tables
+        precomputes, for every possible rank mask, the number of ranks in it, the high card of the best straight
+        it contains and its 5 highest values packed the same way as a hand strength
+    parameters: none
+    returns the rank count table, the straight high card table (0 if no straight) and the top five values table
+    '''
+    rank_counts = [0] * (ALL_RANKS_MASK + 1)
+    straight_highs = [0] * (ALL_RANKS_MASK + 1)
+    top_fives = [0] * (ALL_RANKS_MASK + 1)
+
+    # each mask extends the mask without its highest rank, which is always smaller and so already filled in
+    for mask in range(1, ALL_RANKS_MASK + 1):
+        high = mask.bit_length() - 1
+        rest = mask ^ (1 << high)
+        rank_counts[mask] = rank_counts[rest] + 1
+        # the new rank becomes the highest value and the old fifth highest drops out
+        top_fives[mask] = (high + LOWEST_VALUE) << (VALUE_BITS * (POKER_HAND_TOTAL - 1)) | top_fives[rest] >> VALUE_BITS
+        if high >= 4 and mask >> (high - 4) & 0b11111 == 0b11111:
+            straight_highs[mask] = high + LOWEST_VALUE
+        elif straight_highs[rest]:
+            straight_highs[mask] = straight_highs[rest]
+        elif mask & WHEEL_MASK == WHEEL_MASK:
+            straight_highs[mask] = 5
+
+    return rank_counts, straight_highs, top_fives
+
+RANK_COUNTS, STRAIGHT_HIGHS, TOP_FIVES = build_rank_mask_tables()
+
+def evaluate_suit_masks(diamonds, clubs, hearts, spades):
+    '''
+    function -- evaluate suit masks
+        determines the strength of the best 5 card hand in 5 to 7 cards given as one rank mask per suit,
+        without going through the 5 card combinations
+    parameters: diamonds, clubs, hearts, spades -- rank mask of the cards held in each suit
+    returns the packed strength (int) of the best 5 card hand, equal to the best get_hand_strength of any combination
+    '''
+    # with at most 7 cards a flush rules out four of a kind and a full house
+    for suit_mask in (diamonds, clubs, hearts, spades):
+        if RANK_COUNTS[suit_mask] >= POKER_HAND_TOTAL:
+            high = STRAIGHT_HIGHS[suit_mask]
+            if high == 14:
+                return ROYAL_FLUSH << RANK_SHIFT | high << 16
+            elif high:
+                return STRAIGHT_FLUSH << RANK_SHIFT | high << 16
+            return FLUSH << RANK_SHIFT | TOP_FIVES[suit_mask]
+
+    ranks = diamonds | clubs | hearts | spades
+    fours = diamonds & clubs & hearts & spades
+    if fours:
+        four = fours.bit_length() - 1
+        kickers = TOP_FIVES[ranks ^ (1 << four)] >> 16
+        return FOUR_OF_A_KIND << RANK_SHIFT | (four + LOWEST_VALUE) << 16 | kickers << 12
+
+    # ranks held in at least three / at least two suits
+    threes = (diamonds & clubs & (hearts | spades)) | (hearts & spades & (diamonds | clubs))
+    twos = (diamonds & clubs) | (hearts & spades) | ((diamonds | clubs) & (hearts | spades))
+    if threes:
+        three = threes.bit_length() - 1
+        pairs = twos ^ (1 << three)
+        if pairs:
+            pair = pairs.bit_length() - 1
+            return FULL_HOUSE << RANK_SHIFT | (three + LOWEST_VALUE) << 16 | (pair + LOWEST_VALUE) << 12
+
+    high = STRAIGHT_HIGHS[ranks]
+    if high:
+        return STRAIGHT << RANK_SHIFT | high << 16
+
+    if threes:
+        kickers = TOP_FIVES[ranks ^ (1 << three)] >> 12
+        return THREE_OF_A_KIND << RANK_SHIFT | (three + LOWEST_VALUE) << 16 | kickers << 8
+
+    if twos:
+        pair = twos.bit_length() - 1
+        pairs = twos ^ (1 << pair)
+        if pairs:
+            second_pair = pairs.bit_length() - 1
+            kickers = TOP_FIVES[ranks ^ (1 << pair) ^ (1 << second_pair)] >> 16
+            return (TWO_PAIR << RANK_SHIFT | (pair + LOWEST_VALUE) << 16
+                    | (second_pair + LOWEST_VALUE) << 12 | kickers << 8)
+        kickers = TOP_FIVES[ranks ^ (1 << pair)] >> 8
+        return ONE_PAIR << RANK_SHIFT | (pair + LOWEST_VALUE) << 16 | kickers << 4
+
+    return HIGH_CARD << RANK_SHIFT | TOP_FIVES[ranks]
+
+def get_best_hand_strength(hole_cards, community_cards):
+    '''
+    function -- get best hand strength
+        determines the strength of the best 5 card hand a player can make from their cards and the table
+        by reading all of the cards at once (5 to 7 cards in total)
+    parameters: hole_cards -- list of all the cards in the player's hand
+                community_cards -- list of all the cards on the table
+    returns the packed strength (int) of the player's best 5 card hand
+    '''
+    suit_masks = [0, 0, 0, 0]
+    for card in hole_cards:
+        suit_masks[SUIT_INDEX[card.suit]] |= 1 << (card.value - LOWEST_VALUE)
+    for card in community_cards:
+        suit_masks[SUIT_INDEX[card.suit]] |= 1 << (card.value - LOWEST_VALUE)
+    return evaluate_suit_masks(*suit_masks)
+
+def evaluate_mask(mask):
+    '''
+    function -- evaluate mask
+        determines the strength of the best 5 card hand in a 52 bit card mask holding 5 to 7 cards
+        (see card_codes.py for the card encoding)
+    parameters: mask -- card mask (int) of all of the player's cards and the table
+    returns the packed strength (int) of the player's best 5 card hand
+    '''
+    return evaluate_suit_masks(mask & ALL_RANKS_MASK,
+                               mask >> NUM_VALUES & ALL_RANKS_MASK,
+                               mask >> 2 * NUM_VALUES & ALL_RANKS_MASK,
+                               mask >> 3 * NUM_VALUES)
@@ -0,0 +1,186 @@
+import time
+
+PHASES = ['setup', 'enumeration', 'aggregation']
+
+LOGGER_NAME = 'texas_holdem'
+
+class Stats:
+    '''
+    Class Stats
+        Represents the counters collected while instrumentation is enabled
+
+    Attributes:
+        queries -- number of equity queries answered
+        runouts -- number of runouts (boards) evaluated
+        evaluations -- number of hands evaluated by the enumerations run in this process (on a locked runout the
+                       leader is not evaluated, see probabilities.count_runouts)
+        cache_hits -- number of queries answered from the equity cache
+        cache_misses -- number of queries the equity cache could not answer
+        phase_times -- dict of total seconds spent in each phase (setup, enumeration, aggregation)
+
+    Methods:
+        __init__ -- constructor
+        reset -- sets every counter back to 0
+        runouts_per_second -- runouts evaluated per second of enumeration
+        snapshot -- provides every counter as a dict
+        __str__ -- provides a one line summary (used for the periodic log lines)
+    '''
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.queries = 0
+        self.runouts = 0
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.phase_times = {phase : 0.0 for phase in PHASES}
+
+    def runouts_per_second(self):
+        enumeration_time = self.phase_times['enumeration']
+        return self.runouts / enumeration_time if enumeration_time else 0.0
+
+    def snapshot(self):
+        return {'queries': self.queries, 'runouts': self.runouts, 'evaluations': self.evaluations,
+                'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses,
+                'phase_times': dict(self.phase_times), 'runouts_per_second': self.runouts_per_second()}
+
+    def __str__(self):
+        phases = ', '.join(f'{phase} {seconds:.3f}s' for phase, seconds in self.phase_times.items())
+        return (f'{self.queries} queries, {self.runouts} runouts ({self.runouts_per_second():,.0f}/s), '
+                f'{self.evaluations} evaluations, '
+                f'cache {self.cache_hits} hits / {self.cache_misses} misses, {phases}')
+
+class Query:
+    '''
+    Class Query
+        Represents the timing of one equity query -- used as a context manager around the body of an equity
+        function, it adds the query to the stats however the body returns (not if it raises), and does nothing
+        but check the enabled flag while instrumentation is disabled
+
+    Attributes:
+        timed -- whether instrumentation was enabled when the query started
+        start -- time.perf_counter() reading at the start of the query
+        enumeration_start -- reading at the start of enumeration (None until it starts)
+        aggregation_start -- reading at the start of aggregation (None until it starts)
+        num_runouts -- number of runouts evaluated
+
+    Methods:
+        __init__ -- constructor
+        __enter__ -- starts the query
+        __exit__ -- adds the query to the stats
+        enumerating -- marks the start of enumeration
+        aggregating -- marks the start of aggregation, with the number of runouts evaluated
+    '''
+
+    def __init__(self):
+        self.timed = enabled
+        self.start = time.perf_counter() if self.timed else None
+        self.enumeration_start = None
+        self.aggregation_start = None
+        self.num_runouts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.timed and exc_type is None:
+            # a phase that never started (e.g. a query answered from the store) took no time
+            end = time.perf_counter()
+            enumeration_start = end if self.enumeration_start is None else self.enumeration_start
+            aggregation_start = end if self.aggregation_start is None else self.aggregation_start
+            record_query(self.start, enumeration_start, aggregation_start, end, self.num_runouts)
+        return False
+
+    def enumerating(self):
+        if self.timed:
+            self.enumeration_start = time.perf_counter()
+
+    def aggregating(self, num_runouts):
+        if self.timed:
+            self.aggregation_start = time.perf_counter()
+            self.num_runouts = num_runouts
+
+stats = Stats()
+enabled = False
+log_interval = None
+_last_log = 0.0
+
+def enable(interval=None):
+    '''
+    function -- enable
+        starts collecting stats -- until this is called the probability functions only check one flag per query
+    parameters: interval -- if given, log the stats to the 'texas_holdem' logger at most once every this many seconds
+    returns the Stats object being filled
+    '''
+    global enabled, log_interval, _last_log
+    enabled = True
+    log_interval = interval
+    _last_log = time.perf_counter()
+    return stats
+
+def disable():
+    '''
+    function -- disable
+        stops collecting stats (the collected stats are kept)
+    parameters: none
+    returns nothing
+    '''
+    global enabled
+    enabled = False
+
+def record_query(start, enumeration_start, aggregation_start, end, num_runouts):
+    '''
+    function -- record query
+        adds one answered query to the stats
+    parameters: start, enumeration_start, aggregation_start, end -- time.perf_counter() readings at the start of
+                    each phase and at the end of the query
+                num_runouts -- number of runouts evaluated
+    returns nothing
+    '''
+    stats.queries += 1
+    stats.runouts += num_runouts
+    stats.phase_times['setup'] += enumeration_start - start
+    stats.phase_times['enumeration'] += aggregation_start - enumeration_start
+    stats.phase_times['aggregation'] += end - aggregation_start
+    log_periodically()
+
+def record_evaluations(num_evaluations):
+    '''
+    function -- record evaluations
+        adds the hand evaluations of one enumeration to the stats -- the enumerations report them, since only they
+        know how many evaluations locked runouts skipped
+    parameters: num_evaluations -- number of hands evaluated
+    returns nothing
+    '''
+    stats.evaluations += num_evaluations
+
+def record_cache(hit):
+    '''
+    function -- record cache
+        adds one equity cache lookup to the stats
+    parameters: hit -- True if the cache had the result
+    returns nothing
+    '''
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+    log_periodically()
+
+def log_periodically():
+    '''
+    function -- log periodically
+        logs the stats if a log interval is set and it has passed since the last log line
+    parameters: none
+    returns nothing
+    '''
+    global _last_log
+    if log_interval is None:
+        return
+    now = time.perf_counter()
+    if now - _last_log >= log_interval:
+        _last_log = now
+        import logging # only needed once logging is asked for, and slow to import
+        logging.getLogger(LOGGER_NAME).info('equity stats: %s', stats)
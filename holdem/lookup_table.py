@@ -0,0 +1,169 @@
+import os
+import struct
+import sys
+from array import array
+from itertools import combinations_with_replacement
+
+from .card_codes import NUM_VALUES, cards_to_mask
+from .hand_functions import ALL_RANKS_MASK, POKER_HAND_TOTAL, RANK_COUNTS, evaluate_mask, evaluate_suit_masks
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_table.bin')
+TABLE_MAGIC = b'HEVT'
+TABLE_VERSION = 2
+HEADER_FORMAT = '<4sIII' # magic, version, rank entry count, padding (keeps entries 4-byte aligned)
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAX_CARDS = 7
+MAX_SUITS_PER_RANK = 4
+RANK_KEY_BASE = MAX_SUITS_PER_RANK + 1 # each rank's card count is one base-5 digit of a rank key
+FLUSH_SHIFT = 40 # a suit holding a flush is keyed above every rank key (the largest is under 2**31)
+
+# RANK_KEY_DIGITS[value_index] -- what one card of that value adds to a rank key
+RANK_KEY_DIGITS = [RANK_KEY_BASE ** value_index for value_index in range(NUM_VALUES)]
+
+_table = None
+_table_loaded = False
+
+def get_rank_key(suit_mask):
+    '''
+    function -- get rank key
+        adds up the rank key digits of the ranks held in one suit
+    parameters: suit_mask -- rank mask of the cards held in a suit
+    returns the rank key (int) of those cards
+    '''
+    return sum(digit for value_index, digit in enumerate(RANK_KEY_DIGITS) if suit_mask >> value_index & 1)
+
+def generate_table(path=TABLE_PATH):
+    '''
+    function -- generate table
+        evaluates every hand of 5 to 7 cards once, writing to disk the strength of each flush suit mask and of
+        each set of rank counts without a flush (the strength of such a hand only depends on its rank counts)
+        as flat arrays of unsigned 32 bit integers behind a small header
+    parameters: path -- file to write the table to
+    returns nothing
+    '''
+    rank_keys = array('I')
+    rank_strengths = array('I')
+    for num_cards in range(POKER_HAND_TOTAL, MAX_CARDS + 1):
+        for value_indices in combinations_with_replacement(range(NUM_VALUES), num_cards):
+            # dealing the sorted cards to the suits in turn gives no suit more than 2 cards and no suit a rank twice
+            suit_masks = [0] * MAX_SUITS_PER_RANK
+            for position, value_index in enumerate(value_indices):
+                suit_masks[position % MAX_SUITS_PER_RANK] |= 1 << value_index
+            if sum(RANK_COUNTS[suit_mask] for suit_mask in suit_masks) < num_cards:
+                continue # more than 4 cards of a value
+            rank_keys.append(sum(RANK_KEY_DIGITS[value_index] for value_index in value_indices))
+            rank_strengths.append(evaluate_suit_masks(*suit_masks))
+
+    flush_strengths = array('I', [evaluate_suit_masks(suit_mask, 0, 0, 0)
+                                  if RANK_COUNTS[suit_mask] >= POKER_HAND_TOTAL else 0
+                                  for suit_mask in range(ALL_RANKS_MASK + 1)])
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as table_file:
+        table_file.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION, len(rank_keys), 0))
+        rank_keys.tofile(table_file)
+        rank_strengths.tofile(table_file)
+        flush_strengths.tofile(table_file)
+    os.replace(temp_path, path)
+
+def load_table(path=TABLE_PATH):
+    '''
+    function -- load table
+        reads a generated table
+    parameters: path -- file the table was written to
+    returns a tuple of the key of each suit mask (a flush suit mask is keyed by FLUSH_SHIFT), the dict from rank
+            key to strength and the list of flush strengths by suit mask, or None if the file is missing or not a
+            valid table
+    '''
+    try:
+        with open(path, 'rb') as table_file:
+            data = table_file.read()
+    except OSError:
+        return None
+
+    if len(data) < HEADER_SIZE:
+        return None
+    magic, version, num_entries, _ = struct.unpack_from(HEADER_FORMAT, data)
+    if (magic != TABLE_MAGIC or version != TABLE_VERSION
+            or len(data) != HEADER_SIZE + 4 * (2 * num_entries + ALL_RANKS_MASK + 1)):
+        return None
+
+    entries = memoryview(data)[HEADER_SIZE:].cast('I')
+    rank_strengths = dict(zip(entries[:num_entries], entries[num_entries:2 * num_entries]))
+    flush_strengths = entries[2 * num_entries:].tolist()
+    suit_keys = [(suit_mask + 1) << FLUSH_SHIFT if RANK_COUNTS[suit_mask] >= POKER_HAND_TOTAL
+                 else get_rank_key(suit_mask) for suit_mask in range(ALL_RANKS_MASK + 1)]
+    return suit_keys, rank_strengths, flush_strengths
+
+def get_table():
+    '''
+    function -- get table
+        loads the table on first use only, so importing this module stays cheap
+    parameters: none
+    returns the loaded table, or None if it is not available
+    '''
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table = load_table()
+        _table_loaded = True
+    return _table
+
+def evaluate_cards(hole_cards, community_cards):
+    '''
+    function -- evaluate cards
+        determines the strength of the best 5 card hand in 5 to 7 cards with the precomputed table -- falls back
+        to the pure Python evaluator if the table has not been generated
+    parameters: hole_cards -- list of all the cards in the player's hand
+                community_cards -- list of all the cards on the table
+    returns the packed strength (int) of the player's best 5 card hand (same value as get_best_hand_strength)
+    '''
+    return evaluate_mask_from_table(cards_to_mask(hole_cards + community_cards))
+
+def evaluate_mask_from_table(mask):
+    '''
+    function -- evaluate mask from table
+        same as evaluate_cards, for a 52 bit card mask holding 5 to 7 cards (see card_codes.py) -- one key per
+        suit is added up, so a hand costs 4 list lookups and 1 dict lookup (about twice as fast as evaluate_mask)
+    parameters: mask -- card mask (int) of all of the player's cards and the table
+    returns the packed strength (int) of the player's best 5 card hand (same value as evaluate_mask)
+    '''
+    table = _table if _table_loaded else get_table()
+    if table is None:
+        return evaluate_mask(mask)
+
+    suit_keys, rank_strengths, flush_strengths = table
+    key = (suit_keys[mask & ALL_RANKS_MASK] + suit_keys[mask >> NUM_VALUES & ALL_RANKS_MASK]
+           + suit_keys[mask >> 2 * NUM_VALUES & ALL_RANKS_MASK] + suit_keys[mask >> 3 * NUM_VALUES])
+    if key >> FLUSH_SHIFT:
+        # with at most 7 cards only one suit can hold a flush, and a flush beats anything the rank counts make
+        return flush_strengths[(key >> FLUSH_SHIFT) - 1]
+    return rank_strengths[key]
+
+def get_table_evaluator():
+    '''
+    function -- get table evaluator
+        provides evaluate_mask_from_table as a function closed over the loaded table, so each call goes straight
+        to the lookups (used by the enumerations in probabilities.py when the table has been generated)
+    parameters: none
+    returns the evaluator, a function from a card mask of 5 to 7 cards to its packed strength, or None if the
+            table is not available
+    '''
+    table = get_table()
+    if table is None:
+        return None
+    suit_keys, rank_strengths, flush_strengths = table
+
+    def evaluate(mask):
+        key = (suit_keys[mask & ALL_RANKS_MASK] + suit_keys[mask >> NUM_VALUES & ALL_RANKS_MASK]
+               + suit_keys[mask >> 2 * NUM_VALUES & ALL_RANKS_MASK] + suit_keys[mask >> 3 * NUM_VALUES])
+        if key >> FLUSH_SHIFT:
+            return flush_strengths[(key >> FLUSH_SHIFT) - 1]
+        return rank_strengths[key]
+    return evaluate
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    generate_table(argv[0] if argv else TABLE_PATH)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import atexit
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .card_codes import cards_to_mask
+from .probabilities import count_runouts, count_total_runouts, get_spot_masks, stored_equity
+
+SHARDS_PER_WORKER = 4 # more shards than workers evens out shards that finish early
+
+_pool = None
+_pool_workers = None
+
+def get_pool(workers=None):
+    '''
+    function -- get pool
+        provides the shared worker pool, starting it on first use and keeping it alive across queries
+        so processes are only spawned once (restarts it only if a different number of workers is asked for --
+        work already submitted to the old pool still finishes)
+    parameters: workers -- number of worker processes (default keeps the running pool, or starts one per core)
+    returns the ProcessPoolExecutor
+    '''
+    global _pool, _pool_workers
+    if workers is None and _pool is not None:
+        return _pool
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or workers != _pool_workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+def shutdown_pool():
+    '''
+    function -- shutdown pool
+        stops the shared worker pool if it is running
+    parameters: none
+    returns nothing
+    '''
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+        _pool_workers = None
+
+atexit.register(shutdown_pool)
+
+def map_in_order(function, arguments, workers=None, tasks_per_worker=SHARDS_PER_WORKER):
+    '''
+    function -- map in order
+        calls a function on the worker pool for every set of arguments, keeping only a few calls per worker in
+        flight, so an arbitrarily long (or endless) iterable of arguments is never submitted all at once
+    parameters: function -- function to call (must be picklable, e.g. defined at module level)
+                arguments -- iterable of argument tuples, one per call
+                workers -- number of worker processes (default keeps the running pool, or starts one per core)
+                tasks_per_worker -- number of calls in flight per worker
+    returns a generator of the results, in the order of the arguments
+    '''
+    pool = get_pool(workers)
+    window = _pool_workers * tasks_per_worker
+    pending = deque()
+    for call_arguments in arguments:
+        pending.append(pool.submit(function, *call_arguments))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def get_shard_ranges(total, num_shards):
+    '''
+    function -- get shard ranges
+        splits runout indices 0 to total into contiguous ranges of nearly equal size
+    parameters: total -- number of runouts
+                num_shards -- number of ranges to split into
+    returns a list of (start, stop) pairs covering every runout exactly once
+    '''
+    num_shards = max(1, min(num_shards, total))
+    bounds = [total * i // num_shards for i in range(num_shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(num_shards)]
+
+def count_runouts_parallel(hand_masks, board_mask, live_mask, workers=None, num_shards=None):
+    '''
+    function -- count runouts parallel
+        same as count_runouts, with the runouts split into shards that are counted across the worker pool
+        the shard counts are whole numbers, so the merged counts are exactly the serial counts
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+                workers -- number of worker processes (default keeps the running pool, or starts one per core)
+                num_shards -- number of shards to split the runouts into (default is a few per worker)
+    returns lists of each player's wins, ties and pot shares, and the number of runouts
+    '''
+    pool = get_pool(workers)
+    num_shards = num_shards or _pool_workers * SHARDS_PER_WORKER
+    shard_ranges = get_shard_ranges(count_total_runouts(board_mask, live_mask), num_shards)
+    futures = [pool.submit(count_runouts, hand_masks, board_mask, live_mask, start, stop)
+               for start, stop in shard_ranges]
+
+    num_players = len(hand_masks)
+    wins = [0] * num_players
+    ties = [0] * num_players
+    shares = [0] * num_players
+    total = 0
+    for future in futures:
+        shard_wins, shard_ties, shard_shares, shard_total = future.result()
+        for i in range(num_players):
+            wins[i] += shard_wins[i]
+            ties[i] += shard_ties[i]
+            shares[i] += shard_shares[i]
+        total += shard_total
+    return wins, ties, shares, total
+
+def equity_parallel(hands, board=(), dead=(), workers=None, num_shards=None):
+    '''
+    function -- equity parallel
+        same as probabilities.equity, with the enumeration spread over the worker pool
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                workers -- number of worker processes (default keeps the running pool, or starts one per core)
+                num_shards -- number of shards to split the runouts into (default is a few per worker)
+    returns a list with, for each player, the probability of winning outright, the probability of splitting
+            the pot, and the player's equity (identical to probabilities.equity, and read from the persistent
+            store the same way)
+    raises ValueError if the spot is invalid
+    '''
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    return stored_equity(hand_masks, board_mask, live_mask, cards_to_mask(dead),
+                         partial(count_runouts_parallel, workers=workers, num_shards=num_shards))
@@ -0,0 +1,255 @@
+import argparse
+import math
+import mmap
+import os
+import struct
+from array import array
+from itertools import combinations
+
+from .card_codes import CARD_BITS, FULL_DECK_MASK, NUM_CARDS_IN_DECK, NUM_VALUES, card_to_code, mask_to_codes
+from .equity_cache import canonical_key
+from .probabilities import BOARD_TOTAL, SPLIT_SCALE, count_runouts, equity, get_equities
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_table.bin')
+TABLE_MAGIC = b'HUPF'
+TABLE_VERSION = 1
+HEADER_FORMAT = '<4sIII' # magic, version, number of hands, runouts per matchup
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+NUM_HANDS = NUM_CARDS_IN_DECK * (NUM_CARDS_IN_DECK - 1) // 2 # 1326 two card starting hands
+RUNOUTS_PER_MATCHUP = math.comb(NUM_CARDS_IN_DECK - 4, BOARD_TOTAL)
+VALUE_NAMES = {10: 'T', 11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+
+def get_hand_index(code_1, code_2):
+    '''
+    function -- get hand index
+        gives each of the 1326 two card hands its own index (combinatorial number system)
+    parameters: code_1, code_2 -- codes of the 2 cards, in either order
+    returns the index (int from 0 to 1325) of the hand
+    '''
+    low, high = min(code_1, code_2), max(code_1, code_2)
+    return high * (high - 1) // 2 + low
+
+def get_hand_name(code_1, code_2):
+    '''
+    function -- get hand name
+        names the starting hand class of 2 cards, e.g. 'AA', 'AKs' (suited) or 'T9o' (offsuit)
+    parameters: code_1, code_2 -- codes of the 2 cards
+    returns the class name
+    '''
+    high, low = sorted([code_1 % NUM_VALUES, code_2 % NUM_VALUES], reverse=True)
+    high_name = VALUE_NAMES.get(high + 2, str(high + 2))
+    low_name = VALUE_NAMES.get(low + 2, str(low + 2))
+    if high == low:
+        return high_name + low_name
+    suited = code_1 // NUM_VALUES == code_2 // NUM_VALUES
+    return high_name + low_name + ('s' if suited else 'o')
+
+HAND_CODES = [None] * NUM_HANDS
+for _code_1, _code_2 in combinations(range(NUM_CARDS_IN_DECK), 2):
+    HAND_CODES[get_hand_index(_code_1, _code_2)] = (_code_1, _code_2)
+
+CLASS_NAMES = sorted({get_hand_name(*codes) for codes in HAND_CODES})
+CLASS_INDEX = {name : index for index, name in enumerate(CLASS_NAMES)}
+NUM_CLASSES = len(CLASS_NAMES) # 169
+HAND_CLASSES = [CLASS_INDEX[get_hand_name(*codes)] for codes in HAND_CODES]
+
+_table = None
+_table_loaded = False
+
+def compute_matchup_counts(count_function=None, workers=None):
+    '''
+    function -- compute matchup counts
+        computes every heads-up preflop matchup exactly, enumerating only one matchup of each group of
+        suit-equivalent matchups (and deriving each reversed matchup from its twin)
+    parameters: count_function -- enumeration to use, called with hand, board and live masks (default is the
+                                  NumPy backend if available, otherwise count_runouts)
+                workers -- number of worker processes (default keeps the running pool, or starts one per core)
+    returns a dict from (hand index, hand index) to the first hand's (wins, ties)
+    '''
+    if count_function is None:
+        try:
+            from .vectorized import count_runouts_vectorized, get_tables
+            get_tables()
+            count_function = count_runouts_vectorized
+        except ImportError:
+            count_function = count_runouts
+
+    # each matchup is stored as the index of its suit-equivalent representative and whether it is reversed
+    representatives = []
+    representative_index = {}
+    matchups = []
+    for index_1 in range(NUM_HANDS):
+        mask_1 = CARD_BITS[HAND_CODES[index_1][0]] | CARD_BITS[HAND_CODES[index_1][1]]
+        for index_2 in range(index_1 + 1, NUM_HANDS):
+            mask_2 = CARD_BITS[HAND_CODES[index_2][0]] | CARD_BITS[HAND_CODES[index_2][1]]
+            if mask_1 & mask_2:
+                continue
+            key = canonical_key([mask_1, mask_2], 0)
+            if key in representative_index:
+                matchups.append((index_1, index_2, representative_index[key], False))
+                continue
+            reverse_key = canonical_key([mask_2, mask_1], 0)
+            if reverse_key in representative_index:
+                matchups.append((index_1, index_2, representative_index[reverse_key], True))
+                continue
+            representative_index[key] = len(representatives)
+            representatives.append((mask_1, mask_2))
+            matchups.append((index_1, index_2, representative_index[key], False))
+    representative_index.clear()
+
+    from .parallel import get_pool
+    pool = get_pool(workers)
+    futures = [pool.submit(count_function, [mask_1, mask_2], 0, FULL_DECK_MASK & ~(mask_1 | mask_2))
+               for mask_1, mask_2 in representatives]
+    representative_counts = []
+    for future in futures:
+        wins, ties, _, _ = future.result()
+        representative_counts.append((wins[0], wins[1], ties[0]))
+
+    matchup_counts = {}
+    for index_1, index_2, representative, reverse in matchups:
+        wins_1, wins_2, ties = representative_counts[representative]
+        if reverse:
+            wins_1, wins_2 = wins_2, wins_1
+        matchup_counts[(index_1, index_2)] = (wins_1, ties)
+        matchup_counts[(index_2, index_1)] = (wins_2, ties)
+    return matchup_counts
+
+def build_table(path=TABLE_PATH, count_function=None, workers=None):
+    '''
+    function -- build table
+        computes every heads-up preflop matchup and writes the table to disk -- the (wins, ties) counts of every
+        specific hand against every other hand as unsigned 32 bit integers, followed by the average equity of every
+        starting hand class against every other class (169 x 169 doubles)
+    parameters: path -- file to write the table to
+                count_function -- enumeration to use (see compute_matchup_counts)
+                workers -- number of worker processes (default keeps the running pool, or starts one per core)
+    returns nothing
+    '''
+    matchup_counts = compute_matchup_counts(count_function, workers)
+
+    counts = array('I', bytes(4 * 2 * NUM_HANDS * NUM_HANDS))
+    class_equity_sums = [0.0] * (NUM_CLASSES * NUM_CLASSES)
+    class_matchups = [0] * (NUM_CLASSES * NUM_CLASSES)
+    for (index_1, index_2), (wins, ties) in matchup_counts.items():
+        slot = index_1 * NUM_HANDS + index_2
+        counts[2 * slot] = wins
+        counts[2 * slot + 1] = ties
+        class_slot = HAND_CLASSES[index_1] * NUM_CLASSES + HAND_CLASSES[index_2]
+        class_equity_sums[class_slot] += (wins + ties / 2) / RUNOUTS_PER_MATCHUP
+        class_matchups[class_slot] += 1
+    class_equities = array('d', [equity_sum / num_matchups if num_matchups else 0.0
+                                 for equity_sum, num_matchups in zip(class_equity_sums, class_matchups)])
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as table_file:
+        table_file.write(struct.pack(HEADER_FORMAT, TABLE_MAGIC, TABLE_VERSION, NUM_HANDS, RUNOUTS_PER_MATCHUP))
+        counts.tofile(table_file)
+        class_equities.tofile(table_file)
+    os.replace(temp_path, path)
+
+def load_table(path=TABLE_PATH):
+    '''
+    function -- load table
+        memory-maps a built table read-only
+    parameters: path -- file the table was written to
+    returns memoryviews of the matchup counts and of the class equities, or None if the file is missing or invalid
+    '''
+    try:
+        with open(path, 'rb') as table_file:
+            mapped = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < HEADER_SIZE:
+        mapped.close()
+        return None
+    counts_size = 4 * 2 * NUM_HANDS * NUM_HANDS
+    magic, version, num_hands, runouts = struct.unpack_from(HEADER_FORMAT, mapped)
+    if (magic != TABLE_MAGIC or version != TABLE_VERSION or num_hands != NUM_HANDS
+            or runouts != RUNOUTS_PER_MATCHUP
+            or len(mapped) != HEADER_SIZE + counts_size + 8 * NUM_CLASSES * NUM_CLASSES):
+        mapped.close()
+        return None
+    view = memoryview(mapped)
+    return (view[HEADER_SIZE:HEADER_SIZE + counts_size].cast('I'),
+            view[HEADER_SIZE + counts_size:].cast('d'))
+
+def get_table():
+    '''
+    function -- get table
+        loads the table on first use only
+    parameters: none
+    returns the memory-mapped table, or None if it is not available
+    '''
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table = load_table()
+        _table_loaded = True
+    return _table
+
+def lookup_equity(hand_1, hand_2):
+    '''
+    function -- lookup equity
+        heads-up preflop equity of 2 specific hands, read from the table in constant time
+        (computed exhaustively instead if the table has not been built)
+    parameters: hand_1, hand_2 -- each player's list of 2 hole cards
+    returns the same list as probabilities.equity([hand_1, hand_2])
+    raises ValueError if the hands are invalid or share a card
+    '''
+    codes_1 = [card_to_code(card) for card in hand_1]
+    codes_2 = [card_to_code(card) for card in hand_2]
+    if len(codes_1) != 2 or len(codes_2) != 2 or len(set(codes_1 + codes_2)) != 4:
+        raise ValueError('Invalid hands - please provide 2 hands of 2 distinct cards each')
+
+    hand_masks = [CARD_BITS[codes_1[0]] | CARD_BITS[codes_1[1]], CARD_BITS[codes_2[0]] | CARD_BITS[codes_2[1]]]
+    counts = lookup_counts(hand_masks)
+    if counts is None:
+        return equity([hand_1, hand_2])
+    return get_equities(*counts)
+
+def lookup_counts(hand_masks):
+    '''
+    function -- lookup counts
+        heads-up preflop showdown counts of 2 specific hands, read from the table in constant time
+    parameters: hand_masks -- list of the 2 players' hole card masks (2 distinct cards each, none shared)
+    returns the same counts as probabilities.count_runouts, or None if the table has not been built
+    '''
+    table = get_table()
+    if table is None:
+        return None
+    counts, _ = table
+    slot = get_hand_index(*mask_to_codes(hand_masks[0])) * NUM_HANDS + get_hand_index(*mask_to_codes(hand_masks[1]))
+    wins_1, ties = counts[2 * slot], counts[2 * slot + 1]
+    wins_2 = RUNOUTS_PER_MATCHUP - wins_1 - ties
+    shares = [wins_1 * SPLIT_SCALE + ties * SPLIT_SCALE // 2, wins_2 * SPLIT_SCALE + ties * SPLIT_SCALE // 2]
+    return [wins_1, wins_2], [ties, ties], shares, RUNOUTS_PER_MATCHUP
+
+def lookup_class_equity(class_1, class_2):
+    '''
+    function -- lookup class equity
+        average heads-up preflop equity of one starting hand class against another, e.g. 'AKs' against 'QQ'
+        (every non-overlapping pair of specific hands weighted equally)
+    parameters: class_1, class_2 -- class names such as 'AA', 'AKs' or 'T9o'
+    returns the first class's equity (float)
+    raises ValueError if a class name is invalid or the table has not been built
+    '''
+    for name in (class_1, class_2):
+        if name not in CLASS_INDEX:
+            raise ValueError(f'Invalid starting hand class: {name}')
+    table = get_table()
+    if table is None:
+        raise ValueError('Preflop table not found - please build it first (python preflop_table.py)')
+    _, class_equities = table
+    return class_equities[CLASS_INDEX[class_1] * NUM_CLASSES + CLASS_INDEX[class_2]]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the heads-up preflop equity table.')
+    parser.add_argument('path', nargs='?', default=TABLE_PATH, help='file to write the table to')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args(argv)
+    build_table(args.path, workers=args.workers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,755 @@
+import math
+import random
+import time
+from itertools import chain, combinations, islice
+
+from . import instrumentation
+from . import result_store
+from .card_codes import CARD_BITS, FULL_DECK_MASK, cards_to_mask, code_to_card, count_cards, mask_to_bits, mask_to_codes
+from .hand_functions import RANK_NAMES, RANK_SHIFT, evaluate_mask
+from .Poker import NUM_CARDS_PER_HAND
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 10
+BOARD_TOTAL = 5
+SPLIT_SCALE = 2520 # pot shares are counted in 1/2520ths, which every number of players up to 10 divides exactly
+SAMPLE_CHECK_INTERVAL = 100 # samples drawn between convergence / time budget checks
+CONFIDENCE_Z = 1.96 # 95% confidence interval
+MIN_SAMPLES = 1000 # samples drawn before the standard error target can stop sampling
+PRIOR_SAMPLES = 2 # pseudo-samples of a full win and of a loss added to each player's standard error, so a player
+                  # who has won (or lost) every sample so far does not get a standard error of 0
+
+_evaluator = None
+
+def get_evaluator():
+    '''
+    function -- get evaluator
+        picks the evaluator the enumerations use for the hands of complete boards, on first use -- the table-driven
+        evaluator of lookup_table.py when its table has been generated (the same strengths, about twice as fast),
+        otherwise hand_functions.evaluate_mask (which is still used for the floors of count_runouts, since the
+        table only holds hands of 5 to 7 cards)
+    parameters: none
+    returns the evaluator, a function from the card mask of 5 to 7 cards to their packed strength
+    '''
+    global _evaluator
+    if _evaluator is None:
+        from .lookup_table import get_table_evaluator # reads the table, so only loaded once runouts are evaluated
+        _evaluator = get_table_evaluator() or evaluate_mask
+    return _evaluator
+
+def get_spot_masks(hands, board, dead):
+    '''
+    function -- get spot masks
+        validates a spot and converts it to card masks
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table (0 to 5)
+                dead -- list of known cards that are out of play
+    returns the list of each player's hole card mask, the board mask and the mask of the cards still live in the deck
+    raises ValueError if the number of players, hole cards or board cards is invalid, or if a card appears twice
+    '''
+    if len(hands) < MIN_PLAYERS or len(hands) > MAX_PLAYERS:
+        raise ValueError(f'Invalid number of players - please provide {MIN_PLAYERS} to {MAX_PLAYERS} hands')
+    if len(board) > BOARD_TOTAL:
+        raise ValueError(f'Invalid number of cards in community - please provide 0 to {BOARD_TOTAL}')
+
+    hand_masks = []
+    for hand in hands:
+        if len(hand) != NUM_CARDS_PER_HAND:
+            raise ValueError(f'Invalid hand {hand} - each player needs exactly {NUM_CARDS_PER_HAND} cards')
+        hand_masks.append(cards_to_mask(hand))
+    board_mask = cards_to_mask(board)
+    dead_mask = cards_to_mask(dead)
+
+    used_mask = 0
+    for mask in hand_masks + [board_mask, dead_mask]:
+        if used_mask & mask:
+            raise ValueError('Card appears more than once')
+        used_mask |= mask
+
+    return hand_masks, board_mask, FULL_DECK_MASK & ~used_mask
+
+def count_runouts(hand_masks, board_mask, live_mask, start=0, stop=None):
+    '''
+    function -- count runouts
+        exhaustively deals every possible rest of the board from the live cards and counts the showdowns
+        runouts are always dealt in the same order, so a range of them can be counted on its own and merged later
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+                start -- index of the first runout to count
+                stop -- index after the last runout to count (None for all remaining runouts)
+    returns lists of each player's wins, ties and pot shares (in 1/SPLIT_SCALE units), and the number of runouts
+    '''
+    num_players = len(hand_masks)
+    wins = [0] * num_players
+    ties = [0] * num_players
+    shares = [0] * num_players
+    total = 0
+
+    player_masks = [hand_mask | board_mask for hand_mask in hand_masks]
+    num_missing = BOARD_TOTAL - count_cards(board_mask)
+
+    # a hand only gets stronger as cards are added, so the strength of the cards already known is a floor on the
+    # final strength -- whenever every opponent ends below the leader's floor the leader wins without being
+    # evaluated, which skips most of the work in locked spots (a made hand the others cannot beat, or no outs)
+    floors = [evaluate_mask(player_mask) for player_mask in player_masks]
+    if instrumentation.enabled:
+        instrumentation.record_evaluations(num_players)
+    leader = floors.index(max(floors))
+    leader_mask = player_masks[leader]
+    leader_floor = floors[leader]
+    runouts = get_runout_masks(live_mask, num_missing, start, stop)
+    if num_players == 2:
+        return count_heads_up_runouts(leader_mask, leader_floor, player_masks[1 - leader], leader, runouts)
+
+    others = [i for i in range(num_players) if i != leader]
+    other_masks = [player_masks[i] for i in others]
+    locked = 0 # runouts won on the leader's floor alone
+    evaluate = get_evaluator()
+
+    for runout_mask in runouts:
+        strengths = [evaluate(other_mask | runout_mask) for other_mask in other_masks]
+        best = max(strengths)
+        total += 1
+        if best < leader_floor:
+            locked += 1
+            continue
+
+        leader_strength = evaluate(leader_mask | runout_mask)
+        if leader_strength > best:
+            wins[leader] += 1
+            shares[leader] += SPLIT_SCALE
+            continue
+
+        num_winners = strengths.count(best)
+        if leader_strength < best and num_winners == 1:
+            winner = others[strengths.index(best)]
+            wins[winner] += 1
+            shares[winner] += SPLIT_SCALE
+            continue
+
+        leader_ties = leader_strength == best
+        share = SPLIT_SCALE // (num_winners + leader_ties)
+        if leader_ties:
+            ties[leader] += 1
+            shares[leader] += share
+        for j in range(num_players - 1):
+            if strengths[j] == best:
+                ties[others[j]] += 1
+                shares[others[j]] += share
+
+    wins[leader] += locked
+    shares[leader] += locked * SPLIT_SCALE
+    if instrumentation.enabled:
+        instrumentation.record_evaluations(total * num_players - locked)
+    return wins, ties, shares, total
+
+def count_heads_up_runouts(leader_mask, leader_floor, other_mask, leader, runouts):
+    '''
+    function -- count heads up runouts
+        the 2 player case of count_runouts, keeping every count in a local variable so no list is built or
+        updated per runout
+    parameters: leader_mask -- card mask of the hole cards and board of the player with the stronger floor
+                leader_floor -- strength of the leader's cards before the runout (see count_runouts)
+                other_mask -- card mask of the hole cards and board of the other player
+                leader -- index (0 or 1) of the leader
+                runouts -- iterable of the runout masks to count
+    returns the same counts as count_runouts
+    '''
+    leader_wins = 0
+    other_wins = 0
+    splits = 0
+    locked = 0 # runouts won on the leader's floor alone
+    evaluate = get_evaluator()
+    for runout_mask in runouts:
+        other_strength = evaluate(other_mask | runout_mask)
+        if other_strength < leader_floor:
+            locked += 1
+            continue
+        leader_strength = evaluate(leader_mask | runout_mask)
+        if leader_strength > other_strength:
+            leader_wins += 1
+        elif leader_strength < other_strength:
+            other_wins += 1
+        else:
+            splits += 1
+
+    leader_wins += locked
+    total = leader_wins + other_wins + splits
+    if instrumentation.enabled:
+        instrumentation.record_evaluations(2 * total - locked)
+    wins = [leader_wins, other_wins] if leader == 0 else [other_wins, leader_wins]
+    split_share = splits * SPLIT_SCALE // 2
+    shares = [wins[0] * SPLIT_SCALE + split_share, wins[1] * SPLIT_SCALE + split_share]
+    return wins, [splits, splits], shares, total
+
+def get_runout_masks(live_mask, num_missing, start=0, stop=None):
+    '''
+    function -- get runout masks
+        deals every possible set of missing board cards from the live cards, in a fixed order
+        (the order of itertools.combinations over the live cards)
+    parameters: live_mask -- mask of the cards that can still be dealt
+                num_missing -- number of board cards still to come
+                start -- index of the first runout to deal (reached directly, without dealing the runouts before it)
+                stop -- index after the last runout to deal (None for all remaining runouts)
+    returns an iterator over the card mask of each runout
+    '''
+    live_bits = mask_to_bits(live_mask)
+    if start:
+        runouts = get_runout_masks_from(live_bits, num_missing, start)
+    elif num_missing == 1:
+        runouts = iter(live_bits)
+    elif num_missing == 2:
+        # the turn is or-ed into each river once per turn instead of summing every pair from scratch
+        runouts = (turn | river for i, turn in enumerate(live_bits) for river in live_bits[i + 1:])
+    else:
+        # sets of disjoint bits can be summed instead of or-ed
+        runouts = map(sum, combinations(live_bits, num_missing))
+    return runouts if stop is None else islice(runouts, max(0, stop - start))
+
+def get_runout_masks_from(live_bits, num_missing, start):
+    '''
+    function -- get runout masks from
+        deals the runouts of get_runout_masks from the start-th on -- the runouts whose first card is live_bits[i]
+        come in one block of comb(len(live_bits) - i - 1, num_missing - 1), so the blocks before start are passed
+        over by their size, and only the block holding start is entered (the same way, one card further on)
+    parameters: live_bits -- list of the bits of the cards that can still be dealt, in card order
+                num_missing -- number of board cards still to come
+                start -- index of the first runout to deal
+    returns an iterator over the card mask of each runout from start on
+    '''
+    if num_missing == 0:
+        return iter([0] if start == 0 else [])
+    num_live = len(live_bits)
+    for i in range(num_live):
+        block = math.comb(num_live - i - 1, num_missing - 1)
+        if start < block:
+            first = live_bits[i]
+            rest = live_bits[i + 1:]
+            first_block = (first + runout_mask for runout_mask in get_runout_masks_from(rest, num_missing - 1, start))
+            # every runout after the block has its first card further on, so the rest are plain combinations
+            return chain(first_block, map(sum, combinations(rest, num_missing)))
+        start -= block
+    return iter([])
+
+def new_counts(num_players):
+    '''
+    function -- new counts
+        creates empty showdown counts
+    parameters: num_players -- number of players
+    returns a [wins, ties, shares, total] list with one win/tie/share count per player
+    '''
+    return [[0] * num_players, [0] * num_players, [0] * num_players, 0]
+
+def add_showdown(counts, strengths):
+    '''
+    function -- add showdown
+        adds the outcome of one runout to showdown counts
+    parameters: counts -- [wins, ties, shares, total] list to update
+                strengths -- list of each player's hand strength on the runout
+    returns nothing
+    '''
+    wins, ties, shares, _ = counts
+    best = max(strengths)
+    num_winners = strengths.count(best)
+    if num_winners == 1:
+        winner = strengths.index(best)
+        wins[winner] += 1
+        shares[winner] += SPLIT_SCALE
+    else:
+        share = SPLIT_SCALE // num_winners
+        for i in range(len(strengths)):
+            if strengths[i] == best:
+                ties[i] += 1
+                shares[i] += share
+    counts[3] += 1
+
+def count_runouts_by_card(hand_masks, board_mask, live_mask, category_counts=None):
+    '''
+    function -- count runouts by card
+        counts the showdowns of the last one or two board cards in a single pass, keeping the counts of every
+        next card separately so the next street's equities for each possible card come out of the same pass
+        each player's hole cards and board are combined once, extended with each turn once, then with each river
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table (3 or 4 cards)
+                live_mask -- mask of the cards that can still be dealt
+                category_counts -- optional list of each player's list of counts by rank (HIGH_CARD to
+                                   ROYAL_FLUSH), incremented with the category of each player's hand on every runout
+    returns the counts of all runouts and a dict from each next card's code to the counts of the runouts
+            dealing it, both as [wins, ties, shares, total] lists
+    raises ValueError if the board does not have 3 or 4 cards
+    '''
+    num_players = len(hand_masks)
+    num_missing = BOARD_TOTAL - count_cards(board_mask)
+    if num_missing != 1 and num_missing != 2:
+        raise ValueError('Invalid number of cards in community - please provide 3 or 4')
+
+    player_masks = [hand_mask | board_mask for hand_mask in hand_masks]
+    live_codes = mask_to_codes(live_mask)
+    counts_by_card = {code : new_counts(num_players) for code in live_codes}
+    evaluate = get_evaluator()
+
+    for i, turn in enumerate(live_codes):
+        turn_masks = [player_mask | CARD_BITS[turn] for player_mask in player_masks]
+        turn_counts = counts_by_card[turn]
+
+        if num_missing == 1:
+            strengths = [evaluate(turn_mask) for turn_mask in turn_masks]
+            add_showdown(turn_counts, strengths)
+            if category_counts is not None:
+                for k in range(num_players):
+                    category_counts[k][strengths[k] >> RANK_SHIFT] += 1
+            continue
+
+        for river in live_codes[i + 1:]:
+            river_bit = CARD_BITS[river]
+            strengths = [evaluate(turn_mask | river_bit) for turn_mask in turn_masks]
+            if category_counts is not None:
+                for k in range(num_players):
+                    category_counts[k][strengths[k] >> RANK_SHIFT] += 1
+            # the board is the same whichever of the two cards came first, so it counts for both
+            add_showdown(turn_counts, strengths)
+            add_showdown(counts_by_card[river], strengths)
+
+    # every runout was counted once for each of its cards
+    counts = new_counts(num_players)
+    for card_counts in counts_by_card.values():
+        for j in range(3):
+            for k in range(num_players):
+                counts[j][k] += card_counts[j][k]
+        counts[3] += card_counts[3]
+    for j in range(3):
+        counts[j] = [count // num_missing for count in counts[j]]
+    counts[3] //= num_missing
+
+    if instrumentation.enabled:
+        instrumentation.record_evaluations(counts[3] * num_players)
+    return counts, counts_by_card
+
+def equity_by_card(hands, board, dead=()):
+    '''
+    function -- equity by card
+        determines each player's equity on the flop or turn, together with their equity after each possible
+        next card, from one enumeration pass
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table (3 or 4 cards)
+                dead -- list of known cards that are out of play
+    returns the equities as returned by equity, and a dict from each possible next card (Card) to the equities
+            once that card is dealt -- read from the persistent store instead when one is in use and has the spot
+            and every next card (see result_store.use_store)
+    raises ValueError if the spot is invalid or the board does not have 3 or 4 cards
+    '''
+    with instrumentation.Query() as query:
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+        if len(board) not in (3, 4):
+            raise ValueError('Invalid number of cards in community - please provide 3 or 4')
+        dead_mask = cards_to_mask(dead)
+        store = result_store.default_store
+        stored = None if store is None else get_stored_by_card(store, hand_masks, board_mask, live_mask, dead_mask)
+        if stored is not None:
+            results, equities_by_card = stored
+        else:
+            query.enumerating()
+            counts, counts_by_card = count_runouts_by_card(hand_masks, board_mask, live_mask)
+            query.aggregating(counts[3])
+            results = get_equities(*counts)
+            equities_by_card = {code : get_equities(*card_counts) for code, card_counts in counts_by_card.items()}
+            if store is not None:
+                save_by_card(store, hand_masks, board_mask, dead_mask, results, equities_by_card)
+        next_card_equities = {code_to_card(code) : card_equities for code, card_equities in equities_by_card.items()}
+        return results, next_card_equities
+
+def get_stored_by_card(store, hand_masks, board_mask, live_mask, dead_mask):
+    '''
+    function -- get stored by card
+        reads a spot's equities and the equities after each possible next card from the persistent store
+    parameters: store -- ResultStore to read
+                hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+                dead_mask -- mask of known cards that are out of play
+    returns the equities and a dict from each next card's code to the equities once it is dealt, or None unless
+            the store has every one of them
+    '''
+    stored = store.lookup(hand_masks, board_mask, dead_mask)
+    if stored is None:
+        return None
+    equities_by_card = {}
+    for code in mask_to_codes(live_mask):
+        card_stored = store.lookup(hand_masks, board_mask | CARD_BITS[code], dead_mask)
+        if card_stored is None:
+            return None
+        equities_by_card[code] = list(card_stored)
+    return list(stored), equities_by_card
+
+def save_by_card(store, hand_masks, board_mask, dead_mask, results, equities_by_card):
+    '''
+    function -- save by card
+        writes a spot's equities and the equities after each possible next card to the persistent store, in one
+        transaction (the counts of the runouts dealing a card are exactly the counts of the spot with it dealt)
+    parameters: store -- ResultStore to write
+                hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                dead_mask -- mask of known cards that are out of play
+                results -- the spot's equities
+                equities_by_card -- dict from each next card's code to the equities once it is dealt
+    returns nothing
+    '''
+    spots = [(hand_masks, board_mask, dead_mask, results)]
+    spots.extend((hand_masks, board_mask | CARD_BITS[code], dead_mask, card_equities)
+                 for code, card_equities in equities_by_card.items())
+    store.save_many(spots)
+
+def equity_outs(hands, board, dead=()):
+    '''
+    function -- equity outs
+        determines each player's equity on the flop or turn, how every possible next card turns out for each
+        player, and how often each player ends with each hand category, all from one enumeration pass
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table (3 or 4 cards)
+                dead -- list of known cards that are out of play
+    returns the equities as returned by equity,
+            a dict from each possible next card (Card) to each player's (win, tie, lose) probabilities once that
+            card is dealt (on the turn each of these is 0 or 1, since the card completes the board),
+            and a list of each player's list of probabilities of ending with each rank (HIGH_CARD to ROYAL_FLUSH,
+            see RANK_NAMES)
+            (the equities are written to the persistent store when one is in use, but the spot is always enumerated,
+            since the hand categories are not stored)
+    raises ValueError if the spot is invalid or the board does not have 3 or 4 cards
+    '''
+    with instrumentation.Query() as query:
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+        num_players = len(hand_masks)
+        category_counts = [[0] * len(RANK_NAMES) for _ in range(num_players)]
+        query.enumerating()
+        counts, counts_by_card = count_runouts_by_card(hand_masks, board_mask, live_mask, category_counts)
+        query.aggregating(counts[3])
+
+        card_outcomes = {}
+        for code, (wins, ties, _, total) in counts_by_card.items():
+            card_outcomes[code_to_card(code)] = [(wins[i] / total, ties[i] / total,
+                                                  (total - wins[i] - ties[i]) / total) for i in range(num_players)]
+        categories = [[count / counts[3] for count in player_counts] for player_counts in category_counts]
+        results = get_equities(*counts)
+    # the hand categories are not stored, so this always enumerates, but the equities it finds are written back
+    store = result_store.default_store
+    if store is not None:
+        save_by_card(store, hand_masks, board_mask, cards_to_mask(dead), results,
+                     {code : get_equities(*card_counts) for code, card_counts in counts_by_card.items()})
+    return results, card_outcomes, categories
+
+def get_outs(card_outcomes, player):
+    '''
+    function -- get outs
+        sorts the next cards by how they turn out for one player
+    parameters: card_outcomes -- dict from next card to each player's (win, tie, lose) probabilities, as returned
+                                 by equity_outs
+                player -- index of the player
+    returns the lists of cards that make the player win outright, split the pot, and lose for certain
+            (on the flop, cards that leave the result undecided are in none of the lists)
+    '''
+    win_cards = []
+    tie_cards = []
+    lose_cards = []
+    for card, outcomes in card_outcomes.items():
+        win, tie, lose = outcomes[player]
+        if win == 1:
+            win_cards.append(card)
+        elif tie == 1:
+            tie_cards.append(card)
+        elif lose == 1:
+            lose_cards.append(card)
+    return win_cards, tie_cards, lose_cards
+
+def equity(hands, board=(), dead=()):
+    '''
+    function -- equity
+        determines each player's chances by enumerating every possible rest of the board
+        handles 2 to 10 players, 0 to 5 cards on the table and any known dead cards
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+    returns a list with, for each player, the probability of winning outright, the probability of splitting
+            the pot, and the player's equity (share of the pot won on average, split pots included)
+            -- read from the preflop table or the persistent store instead when they have the spot (see stored_equity)
+    raises ValueError if the spot is invalid
+    '''
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    return stored_equity(hand_masks, board_mask, live_mask, cards_to_mask(dead))
+
+def stored_equity(hand_masks, board_mask, live_mask, dead_mask, count_function=count_runouts):
+    '''
+    function -- stored equity
+        the lookup-or-compute path shared by the equity entry points -- reads heads-up preflop spots (no dead cards)
+        from the preflop table when it has been built, and other spots from the persistent store when one is in use
+        and has them, and otherwise counts the runouts and writes the equities back to the store
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+                dead_mask -- mask of known cards that are out of play
+                count_function -- enumeration to run if the store does not have the spot, e.g. count_runouts or
+                                  parallel.count_runouts_parallel (called with the hand, board and live masks)
+    returns the equities as returned by equity
+    '''
+    with instrumentation.Query() as query:
+        known = get_known_equities(hand_masks, board_mask, dead_mask)
+        if known is not None:
+            return known
+        query.enumerating()
+        counts = count_function(hand_masks, board_mask, live_mask)
+        query.aggregating(counts[3])
+        results = get_equities(*counts)
+    store = result_store.default_store
+    if store is not None:
+        store.save(hand_masks, board_mask, dead_mask, results)
+    return results
+
+def get_known_equities(hand_masks, board_mask, dead_mask):
+    '''
+    function -- get known equities
+        reads a spot's equities without enumerating -- heads-up preflop spots (no dead cards) from the preflop table
+        when it has been built, and other spots from the persistent store when one is in use
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                dead_mask -- mask of known cards that are out of play
+    returns the equities as returned by equity, or None if neither has the spot
+    '''
+    if len(hand_masks) == 2 and not board_mask and not dead_mask:
+        from .preflop_table import lookup_counts # only loaded by processes that see heads-up preflop spots
+        counts = lookup_counts(hand_masks)
+        if counts is not None:
+            return get_equities(*counts)
+    store = result_store.default_store
+    if store is not None:
+        stored = store.lookup(hand_masks, board_mask, dead_mask)
+        if stored is not None:
+            return list(stored)
+    return None
+
+def equity_threshold(hands, threshold, board=(), dead=(), player=0):
+    '''
+    function -- equity threshold
+        decides whether a player's equity is at least a threshold, enumerating runouts only until the answer is
+        certain -- the runouts still to come are assumed to all be won or all be lost to bound the final equity
+    parameters: hands -- list of each player's list of 2 hole cards
+                threshold -- equity to compare against (0 to 1)
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                player -- index of the player whose equity is compared
+    returns True if the player's equity is at least the threshold, False otherwise, and the number of runouts
+            that were evaluated to decide (0 when the equities were read from the preflop table or the persistent
+            store, see get_known_equities)
+    raises ValueError if the spot or the player is invalid
+    '''
+    with instrumentation.Query() as query:
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+        if not 0 <= player < len(hand_masks):
+            raise ValueError(f'Invalid player - please provide 0 to {len(hand_masks) - 1}')
+        known = get_known_equities(hand_masks, board_mask, cards_to_mask(dead))
+        if known is not None:
+            return known[player][2] >= threshold, 0
+        total = count_total_runouts(board_mask, live_mask)
+        # the player's pot shares (in 1/SPLIT_SCALE units, like the counts of count_runouts) are divided exactly as
+        # get_equities divides them, so passing the equity that equity() returns as the threshold gives True
+        scale = SPLIT_SCALE * total
+        player_mask = hand_masks[player] | board_mask
+        player_floor = evaluate_mask(player_mask) # see count_runouts
+        other_masks = [hand_mask | board_mask for i, hand_mask in enumerate(hand_masks) if i != player]
+
+        share = 0
+        seen = 0
+        locked = 0 # runouts won on the player's floor alone
+        reached = None
+        evaluate = get_evaluator()
+        query.enumerating()
+        for runout_mask in get_runout_masks(live_mask, BOARD_TOTAL - count_cards(board_mask)):
+            strengths = [evaluate(other_mask | runout_mask) for other_mask in other_masks]
+            best_other = max(strengths)
+            if best_other < player_floor:
+                share += SPLIT_SCALE
+                locked += 1
+            else:
+                strength = evaluate(player_mask | runout_mask)
+                if strength > best_other:
+                    share += SPLIT_SCALE
+                elif strength == best_other:
+                    share += SPLIT_SCALE // (1 + strengths.count(strength))
+            seen += 1
+            if seen % SAMPLE_CHECK_INTERVAL == 0:
+                if share / scale >= threshold:
+                    reached = True
+                    break
+                if (share + (total - seen) * SPLIT_SCALE) / scale < threshold:
+                    reached = False
+                    break
+
+        query.aggregating(seen)
+        if reached is None:
+            reached = share / scale >= threshold
+        if instrumentation.enabled:
+            instrumentation.record_evaluations(1 + seen * len(hand_masks) - locked)
+        return reached, seen
+
+def count_total_runouts(board_mask, live_mask):
+    '''
+    function -- count total runouts
+        determines how many possible rests of the board can be dealt
+    parameters: board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+    returns the number of runouts (int)
+    '''
+    return math.comb(count_cards(live_mask), BOARD_TOTAL - count_cards(board_mask))
+
+def get_equities(wins, ties, shares, total):
+    '''
+    function -- get equities
+        converts showdown counts to probabilities
+    parameters: wins, ties, shares, total -- counts as returned by count_runouts
+    returns a list with, for each player, the probability of winning outright, the probability of splitting
+            the pot, and the player's equity
+    '''
+    return [(wins[i] / total, ties[i] / total, shares[i] / (SPLIT_SCALE * total)) for i in range(len(wins))]
+
+def equity_monte_carlo(hands, board=(), dead=(), target_std_error=0.001, time_budget=None,
+                       max_samples=1000000, seed=None):
+    '''
+    function -- equity monte carlo
+        estimates each player's equity by dealing random rests of the board, stopping as soon as every player's
+        standard error is at most the target, the time budget runs out or the sample limit is reached
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                target_std_error -- stop once every player's standard error is at or below this, after at least
+                                    MIN_SAMPLES runouts (None to ignore)
+                time_budget -- maximum time to spend sampling, in seconds (None for no limit)
+                max_samples -- maximum number of runouts to draw (at least 1)
+                seed -- seed for the random number generator, to make the estimate reproducible
+    returns a list with, for each player, the estimated equity, its standard error and its 95% confidence
+            interval as a (low, high) pair, and the number of runouts sampled
+    raises ValueError if the spot is invalid or max_samples is below 1
+    '''
+    with instrumentation.Query() as query:
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+        if max_samples < 1:
+            raise ValueError(f'Invalid number of samples - please provide at least 1: {max_samples}')
+        num_players = len(hand_masks)
+        num_missing = BOARD_TOTAL - count_cards(board_mask)
+
+        if num_missing == 0:
+            query.enumerating()
+            _, _, shares, _ = count_runouts(hand_masks, board_mask, live_mask)
+            query.aggregating(1)
+            results = [(share / SPLIT_SCALE, 0.0, (share / SPLIT_SCALE, share / SPLIT_SCALE)) for share in shares]
+            return results, 1
+
+        rng = random.Random(seed)
+        live_bits = mask_to_bits(live_mask)
+        player_masks = [hand_mask | board_mask for hand_mask in hand_masks]
+        shares = [0] * num_players
+        squared_shares = [0] * num_players
+        samples = 0
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        evaluate = get_evaluator()
+        query.enumerating()
+
+        while samples < max_samples:
+            for _ in range(min(SAMPLE_CHECK_INTERVAL, max_samples - samples)):
+                runout_mask = sum(rng.sample(live_bits, num_missing))
+                strengths = [evaluate(player_mask | runout_mask) for player_mask in player_masks]
+                best = max(strengths)
+                share = SPLIT_SCALE // strengths.count(best)
+                for i in range(num_players):
+                    if strengths[i] == best:
+                        shares[i] += share
+                        squared_shares[i] += share * share
+                samples += 1
+
+            std_errors = get_std_errors(shares, squared_shares, samples)
+            if target_std_error is not None and samples >= MIN_SAMPLES and max(std_errors) <= target_std_error:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        query.aggregating(samples)
+        if instrumentation.enabled:
+            instrumentation.record_evaluations(samples * num_players)
+        results = []
+        for i in range(num_players):
+            mean = shares[i] / (SPLIT_SCALE * samples)
+            margin = CONFIDENCE_Z * std_errors[i]
+            results.append((mean, std_errors[i], (max(0.0, mean - margin), min(1.0, mean + margin))))
+        return results, samples
+
+def get_std_errors(shares, squared_shares, samples):
+    '''
+    function -- get std errors
+        determines the standard error of each player's sampled equity, counting PRIOR_SAMPLES extra samples of a
+        full win and of a loss (the plug-in estimate is 0 while every sample has gone the same way)
+    parameters: shares -- list of each player's summed pot shares (in 1/SPLIT_SCALE units)
+                squared_shares -- list of each player's summed squared pot shares
+                samples -- number of runouts sampled
+    returns a list of each player's standard error
+    '''
+    std_errors = []
+    prior_samples = samples + 2 * PRIOR_SAMPLES
+    for share, squared_share in zip(shares, squared_shares):
+        mean = (share / SPLIT_SCALE + PRIOR_SAMPLES) / prior_samples
+        variance = max(0.0, (squared_share / (SPLIT_SCALE * SPLIT_SCALE) + PRIOR_SAMPLES) / prior_samples - mean * mean)
+        std_errors.append(math.sqrt(variance / prior_samples))
+    return std_errors
+
+def prob_river_unknown(player_1, player_2, community, game):
+    '''
+    function -- prob river unknown
+        determine the probability of win/tie for 2 players during a game where the river (5th card) has not been revealed
+    parameters: player_1 -- list of player 1's cards
+                player_2 -- list of player 2's cards
+                community -- list of cards on the table
+                game -- Poker game object
+    returns the probability player 1 wins, the probability the players tie, and the probability player 2 wins
+    '''
+    return prob_heads_up(player_1, player_2, community, game)
+
+def prob_turn_and_river_unknown(player_1, player_2, community, game):
+    '''
+    function -- prob turn and river unknown
+        determine the probability of win/tie for 2 players during a game where the turn (4th card) and the river (5th card) have not yet been revealed
+    parameters: player_1 -- list of player 1's cards
+                player_2 -- list of player 2's cards
+                community -- list of cards on the table
+                game -- Poker game object
+    returns the probability player 1 wins, the probability the players tie, and the probability player 2 wins
+    '''
+    return prob_heads_up(player_1, player_2, community, game)
+
+def prob_heads_up(player_1, player_2, community, game):
+    '''
+    function -- prob heads up
+        determine the probability of win/tie for 2 players, dealing the rest of the board from the game's deck
+    parameters: player_1 -- list of player 1's cards
+                player_2 -- list of player 2's cards
+                community -- list of cards on the table
+                game -- Poker game object
+    returns the probability player 1 wins, the probability the players tie, and the probability player 2 wins
+    '''
+    with instrumentation.Query() as query:
+        hand_masks = [cards_to_mask(player_1), cards_to_mask(player_2)]
+        board_mask = cards_to_mask(community)
+        live_mask = game.deck_mask & ~(hand_masks[0] | hand_masks[1] | board_mask)
+        query.enumerating()
+        wins, ties, _, total = count_runouts(hand_masks, board_mask, live_mask)
+        query.aggregating(total)
+        return wins[0] / total, ties[0] / total, wins[1] / total
+    
+def display_probs(player_1, tie, player_2):
+    '''
+    function -- display probs
+        displays the probabilities of player 1 winning, the players ending in a tie, and player 2 winning in percent format
+    paramaters: player_1 -- probability of player 1 winning
+                tie -- probability of a tie
+                player_2 -- probability of player 2 winning
+    returns nothing 
+    '''
+    print(f'\nProbability of Player 1 winning: {player_1:.2%}')
+    print(f'Probability of Tie: {tie:.2%}')
+    print(f'Probability of Player 2 winning: {player_2:.2%}')
\ No newline at end of file
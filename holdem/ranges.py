@@ -0,0 +1,273 @@
+import hashlib
+import math
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+
+from .card_codes import (CARD_BITS, CARD_TEXT_VALUES, FULL_DECK_MASK, NUM_VALUES, cards_to_mask, count_cards,
+                         parse_cards)
+from .equity_counts import EquityCounts
+from .probabilities import BOARD_TOTAL, SPLIT_SCALE, count_total_runouts, get_evaluator, get_runout_masks
+
+NUM_SUITS = 4
+
+def parse_value(char):
+    '''
+    function -- parse value
+        converts a range notation value character ('2' to '9', 'T', 'J', 'Q', 'K', 'A') to a card value
+    parameters: char -- value character, in either case
+    returns the card value (int from 2 to 14)
+    raises ValueError if the character is not a value
+    '''
+    char = char.upper()
+    if char in CARD_TEXT_VALUES:
+        return CARD_TEXT_VALUES[char]
+    if char.isdigit() and 2 <= int(char) <= 9:
+        return int(char)
+    raise ValueError(f'Invalid card value in range: {char}')
+
+def get_class_combos(high, low, kind):
+    '''
+    function -- get class combos
+        lists the hole card masks of a starting hand class
+    parameters: high, low -- the 2 card values (equal for a pair)
+                kind -- 's' for suited, 'o' for offsuit, '' for both (ignored for pairs)
+    returns a list of hole card masks (6 for a pair, 4 suited, 12 offsuit)
+    '''
+    high_bits = [CARD_BITS[suit * NUM_VALUES + high - 2] for suit in range(NUM_SUITS)]
+    low_bits = [CARD_BITS[suit * NUM_VALUES + low - 2] for suit in range(NUM_SUITS)]
+    combos = []
+    for suit_1 in range(NUM_SUITS):
+        for suit_2 in range(NUM_SUITS):
+            if high == low:
+                if suit_1 < suit_2:
+                    combos.append(high_bits[suit_1] | low_bits[suit_2])
+            elif kind != 'o' and suit_1 == suit_2:
+                combos.append(high_bits[suit_1] | low_bits[suit_2])
+            elif kind != 's' and suit_1 != suit_2:
+                combos.append(high_bits[suit_1] | low_bits[suit_2])
+    return combos
+
+def parse_class(text):
+    '''
+    function -- parse class
+        splits a starting hand class such as 'QQ', 'AKs', 'T9o' or 'AK' into its values and kind
+    parameters: text -- class text
+    returns the higher value, the lower value and the kind ('s', 'o' or '')
+    raises ValueError if the text is not a class
+    '''
+    if len(text) not in (2, 3) or (len(text) == 3 and text[2].lower() not in 'so'):
+        raise ValueError(f'Invalid hand class in range: {text}')
+    high, low = sorted([parse_value(text[0]), parse_value(text[1])], reverse=True)
+    kind = text[2].lower() if len(text) == 3 else ''
+    if high == low and kind:
+        raise ValueError(f'Invalid hand class in range: {text} - pairs cannot be suited or offsuit')
+    return high, low, kind
+
+def parse_range_item(item):
+    '''
+    function -- parse range item
+        expands one comma-separated item of range notation to its classes' combos
+        supports 'QQ', 'AKs', 'AKo', 'AK', 'QQ+' (QQ and better pairs), 'A5s+' (A5s up to AKs), 'QQ-99',
+        '76s-54s' (connectors), 'A9s-A6s' (kickers) and specific hands such as 'AhKh'
+    parameters: item -- text of the item, without its weight
+    returns a list of hole card masks
+    raises ValueError if the item is not valid range notation
+    '''
+    if len(item) == 4 and item[1].upper() in 'DCHS' and item[3].upper() in 'DCHS':
+        cards = parse_cards(item)
+        if len(cards) != 2:
+            raise ValueError(f'Invalid hand in range: {item}')
+        return [cards_to_mask(cards)]
+
+    if item.endswith('+'):
+        high, low, kind = parse_class(item[:-1])
+        if high == low:
+            return [combo for value in range(high, 15) for combo in get_class_combos(value, value, kind)]
+        return [combo for value in range(low, high) for combo in get_class_combos(high, value, kind)]
+
+    if '-' in item:
+        first, last = item.split('-', 1)
+        high_1, low_1, kind_1 = parse_class(first)
+        high_2, low_2, kind_2 = parse_class(last)
+        if kind_1 != kind_2:
+            raise ValueError(f'Invalid range item: {item} - both ends must be the same kind')
+        if high_1 == low_1 and high_2 == low_2:
+            values = range(min(high_1, high_2), max(high_1, high_2) + 1)
+            return [combo for value in values for combo in get_class_combos(value, value, kind_1)]
+        if high_1 == high_2:
+            values = range(min(low_1, low_2), max(low_1, low_2) + 1)
+            return [combo for value in values for combo in get_class_combos(high_1, value, kind_1)]
+        if high_1 - low_1 == high_2 - low_2:
+            gap = high_1 - low_1
+            values = range(min(high_1, high_2), max(high_1, high_2) + 1)
+            return [combo for value in values for combo in get_class_combos(value, value - gap, kind_1)]
+        raise ValueError(f'Invalid range item: {item}')
+
+    high, low, kind = parse_class(item)
+    return get_class_combos(high, low, kind)
+
+def parse_range(text):
+    '''
+    function -- parse range
+        parses range notation such as 'QQ+, AKs, 76s-54s' into weighted combos
+        an item can be given a weight with a colon, e.g. 'AKo:0.5' (default weight is 1); later items override
+        earlier ones, so 'AK, AhKh:0.25' weights one specific combo differently
+    parameters: text -- range notation
+    returns a dict from hole card mask to weight (combos with weight 0 are left out)
+    raises ValueError if the notation is invalid
+    '''
+    combos = {}
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        weight = 1.0
+        if ':' in item:
+            item, weight_text = item.split(':', 1)
+            weight = float(weight_text)
+            if weight < 0:
+                raise ValueError(f'Invalid weight in range: {weight_text}')
+        for combo in parse_range_item(item.strip()):
+            combos[combo] = weight
+    return {combo : weight for combo, weight in combos.items() if weight > 0}
+
+def get_integer_weights(*ranges):
+    '''
+    function -- get integer weights
+        scales the weights of ranges to whole numbers, so weighted counts can be added up exactly
+        float weights are read as the decimal they print as (0.1 is 1/10)
+    parameters: ranges -- dicts from hole card mask to weight
+    returns a list of dicts from hole card mask to integer weight, one for each range
+    '''
+    fractions = [{mask : Fraction(repr(weight)) if isinstance(weight, float) else Fraction(weight)
+                  for mask, weight in weights.items()} for weights in ranges]
+    scale = math.lcm(*[weight.denominator for weights in fractions for weight in weights.values()])
+    return [{mask : int(weight * scale) for mask, weight in weights.items()} for weights in fractions]
+
+def get_range_key(range_1, range_2, board_mask, dead_mask):
+    '''
+    function -- get range key
+        identifies a range-vs-range spot, so the counts of its shards can only be merged with each other
+    parameters: range_1, range_2 -- dicts from hole card mask to integer weight
+                board_mask -- mask of the cards on the table
+                dead_mask -- mask of known cards that are out of play
+    returns the key (hex digest string)
+    '''
+    description = repr((sorted(range_1.items()), sorted(range_2.items()), board_mask, dead_mask))
+    return hashlib.sha256(description.encode()).hexdigest()
+
+def count_range_runouts(range_1, range_2, board=(), dead=(), start=0, stop=None):
+    '''
+    function -- count range runouts
+        counts the weighted showdowns of one range of hands against another over every rest of the board
+        combos that share a card with the board, the dead cards or the opposing combo are left out, and every
+        remaining pair of combos counts in proportion to the product of their weights
+        each combo is evaluated once per runout and shared by all the combos it faces, which are compared in
+        sorted order rather than one pair at a time
+        runouts are always dealt in the same order, so a range of them can be counted on its own (on any machine)
+        and the counts merged exactly later
+    parameters: range_1, range_2 -- range notation (see parse_range) or dict from hole card mask to weight
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                start -- index of the first runout to count
+                stop -- index after the last runout to count (None for all remaining runouts)
+    returns the EquityCounts of the 2 ranges, in weighted pairs of combos (weights scaled to whole numbers)
+    raises ValueError if a range is invalid or no pair of combos is possible
+    '''
+    if isinstance(range_1, str):
+        range_1 = parse_range(range_1)
+    if isinstance(range_2, str):
+        range_2 = parse_range(range_2)
+    if len(board) > BOARD_TOTAL:
+        raise ValueError(f'Invalid number of cards in community - please provide 0 to {BOARD_TOTAL}')
+    board_mask = cards_to_mask(board)
+    dead_mask = cards_to_mask(dead)
+    if board_mask & dead_mask:
+        raise ValueError('Card appears more than once')
+
+    range_1, range_2 = get_integer_weights(range_1, range_2)
+    used_mask = board_mask | dead_mask
+    combos_1 = [(mask, weight) for mask, weight in range_1.items() if not mask & used_mask]
+    combos_2 = [(mask, weight) for mask, weight in range_2.items() if not mask & used_mask]
+    # opposing combos that share a card, found once instead of once per runout
+    blockers = [[j for j, (mask_2, _) in enumerate(combos_2) if mask_1 & mask_2] for mask_1, _ in combos_1]
+    if not any(len(blockers[i]) < len(combos_2) for i in range(len(combos_1))):
+        raise ValueError('No possible matchup between the ranges on this board')
+
+    live_mask = FULL_DECK_MASK & ~used_mask
+    num_runouts = count_total_runouts(board_mask, live_mask)
+    stop = num_runouts if stop is None else min(stop, num_runouts)
+    num_missing = BOARD_TOTAL - count_cards(board_mask)
+    win_weight = 0
+    tie_weight = 0
+    total_weight = 0
+    evaluate = get_evaluator()
+
+    for runout_mask in get_runout_masks(live_mask, num_missing, start, stop):
+        table_mask = board_mask | runout_mask
+        strengths_2 = [evaluate(mask | table_mask) if not mask & runout_mask else None
+                       for mask, _ in combos_2]
+        ordered = sorted((strength, combos_2[j][1]) for j, strength in enumerate(strengths_2) if strength is not None)
+        ordered_strengths = [strength for strength, _ in ordered]
+        cumulative_weights = [0]
+        for _, weight in ordered:
+            cumulative_weights.append(cumulative_weights[-1] + weight)
+
+        for i, (mask_1, weight_1) in enumerate(combos_1):
+            if mask_1 & runout_mask:
+                continue
+            strength_1 = evaluate(mask_1 | table_mask)
+            below = cumulative_weights[bisect_left(ordered_strengths, strength_1)]
+            up_to = cumulative_weights[bisect_right(ordered_strengths, strength_1)]
+            facing = cumulative_weights[-1]
+            for j in blockers[i]:
+                strength_2 = strengths_2[j]
+                if strength_2 is None:
+                    continue
+                weight_2 = combos_2[j][1]
+                facing -= weight_2
+                if strength_2 < strength_1:
+                    below -= weight_2
+                    up_to -= weight_2
+                elif strength_2 == strength_1:
+                    up_to -= weight_2
+            win_weight += weight_1 * below
+            tie_weight += weight_1 * (up_to - below)
+            total_weight += weight_1 * facing
+
+    lose_weight = total_weight - win_weight - tie_weight
+    tie_share = tie_weight * SPLIT_SCALE // 2
+    return EquityCounts([win_weight, lose_weight], [tie_weight, tie_weight],
+                        [win_weight * SPLIT_SCALE + tie_share, lose_weight * SPLIT_SCALE + tie_share], total_weight,
+                        get_range_key(range_1, range_2, board_mask, dead_mask),
+                        [(start, stop)] if start < stop else [], num_runouts)
+
+def get_range_shards(board=(), dead=(), num_shards=1):
+    '''
+    function -- get range shards
+        splits the runouts of a range-vs-range spot into shards of nearly equal size, to be counted separately
+        with count_range_runouts
+    parameters: board -- list of cards on the table
+                dead -- list of known cards that are out of play
+                num_shards -- number of shards
+    returns a list of (start, stop) runout index ranges covering every runout exactly once
+    '''
+    from .parallel import get_shard_ranges
+    board_mask = cards_to_mask(board)
+    live_mask = FULL_DECK_MASK & ~(board_mask | cards_to_mask(dead))
+    return get_shard_ranges(count_total_runouts(board_mask, live_mask), num_shards)
+
+def range_equity(range_1, range_2, board=(), dead=()):
+    '''
+    function -- range equity
+        determines the equity of one range of hands against another by enumerating every rest of the board
+        (see count_range_runouts)
+    parameters: range_1, range_2 -- range notation (see parse_range) or dict from hole card mask to weight
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+    returns a list with, for each range, the probability of winning outright, the probability of splitting
+            the pot, and the range's equity (the same format as probabilities.equity)
+    raises ValueError if a range is invalid or no pair of combos is possible
+    '''
+    # every possible pair of combos sees the same number of runouts, so weighting by runout is exact
+    return count_range_runouts(range_1, range_2, board, dead).get_equities()
@@ -0,0 +1,268 @@
+import os
+import time
+from collections import deque
+from itertools import starmap
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.sqlite3')
+DEFAULT_MAX_ENTRIES = 1000000
+EVICTION_POLICIES = ['lru', 'fifo']
+EVICTION_CHECK_INTERVAL = 64 # writes between checks of the size limit (counting the rows scans the table)
+LRU_REFRESH_SECONDS = 60.0 # a hit only rewrites its last use time once it is this old, so most reads do not write
+BUSY_TIMEOUT = 30.0 # seconds to wait for another process's write to finish
+WARM_BATCH_SIZE = 256 # results written per transaction while warming, so an interrupted warm keeps most of its work
+WARM_TASKS_PER_WORKER = 4 # spots in flight per worker while warming, bounds memory however long the log is
+
+default_store = None
+
+class ResultStore:
+    '''
+    Class ResultStore
+        Represents a persistent store of equity results on disk (SQLite), keyed by canonical spot (see
+        equity_cache.canonical_key) and shared safely by any number of processes -- the database is in
+        write-ahead log mode, so readers are never blocked by a writer
+
+    Attributes:
+        path -- file of the database
+        max_entries -- maximum number of results kept (checked every EVICTION_CHECK_INTERVAL writes)
+        eviction -- which results to drop when full, 'lru' (least recently used) or 'fifo' (oldest stored)
+        hits -- number of lookups in this process that found a result
+        misses -- number of lookups in this process that did not
+
+    Methods:
+        __init__ -- constructor
+            raises ValueError for an invalid size or eviction policy
+        connect -- opens this process's connection to the database
+        get -- looks a result up by key, counting the hit or miss
+        put -- stores a result by key, evicting the oldest results if the store is over its size limit
+        put_many -- stores many results by key in one transaction
+        evict -- drops results until the store is within its size limit
+        lookup -- looks a spot's result up by its masks
+        save -- stores a spot's result by its masks
+        save_many -- stores many spots' results by their masks in one transaction
+        warm -- computes and stores every spot of a query log that is not stored yet
+        stats -- provides the hit/miss counters and size
+        clear -- removes every result and resets the counters
+        close -- closes this process's connection
+        __len__ -- number of results currently stored
+    '''
+
+    def __init__(self, path=STORE_PATH, max_entries=DEFAULT_MAX_ENTRIES, eviction='lru'):
+        if max_entries < 1:
+            raise ValueError('Invalid store size - please provide at least 1')
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f'Invalid eviction policy - please use one of {EVICTION_POLICIES}')
+        self.path = path
+        self.max_entries = max_entries
+        self.eviction = eviction
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._connection = None
+        self._pid = None
+
+    def connect(self):
+        '''
+        function -- connect
+            opens this process's connection on first use (a connection cannot be shared with forked processes,
+            so a worker that inherits the store opens its own)
+        parameters: none
+        returns the sqlite3 connection
+        '''
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3 # only loaded by processes that use a store
+            # not tied to the thread that opened it, so the service can run every store call on a thread of its own
+            self._connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                               check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS results '
+                                     '(key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key):
+        import json # like sqlite3, only loaded once a store is used, to keep imports of the equity functions fast
+        row = self.connect().execute('SELECT result, last_used FROM results WHERE key = ?',
+                                     (encode_key(key),)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        if self.eviction == 'lru' and now - row[1] >= LRU_REFRESH_SECONDS:
+            self.connect().execute('UPDATE results SET last_used = ? WHERE key = ?', (now, encode_key(key)))
+        return tuple(tuple(player_result) for player_result in json.loads(row[0]))
+
+    def put(self, key, result):
+        import json
+        connection = self.connect()
+        connection.execute('INSERT OR REPLACE INTO results (key, result, last_used) VALUES (?, ?, ?)',
+                           (encode_key(key), json.dumps(result), time.time()))
+        self._writes += 1
+        if self._writes % EVICTION_CHECK_INTERVAL == 0:
+            self.evict()
+
+    def put_many(self, items):
+        '''
+        function -- put many
+            stores many results in one transaction (much faster than one put each), evicting like put
+        parameters: items -- iterable of (key, result) pairs
+        returns the number of results stored
+        '''
+        import json
+        connection = self.connect()
+        now = time.time()
+        num_items = 0
+        connection.execute('BEGIN')
+        try:
+            for key, result in items:
+                connection.execute('INSERT OR REPLACE INTO results (key, result, last_used) VALUES (?, ?, ?)',
+                                   (encode_key(key), json.dumps(result), now))
+                num_items += 1
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        previous_writes = self._writes
+        self._writes += num_items
+        if self._writes // EVICTION_CHECK_INTERVAL != previous_writes // EVICTION_CHECK_INTERVAL:
+            self.evict()
+        return num_items
+
+    def evict(self):
+        '''
+        function -- evict
+            drops the least recently used (or oldest stored) results until the store is within its size limit
+        parameters: none
+        returns the number of results dropped
+        '''
+        connection = self.connect()
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        connection.execute('DELETE FROM results WHERE key IN '
+                           '(SELECT key FROM results ORDER BY last_used LIMIT ?)', (excess,))
+        return excess
+
+    def lookup(self, hand_masks, board_mask, dead_mask=0):
+        from .equity_cache import canonical_key
+        return self.get(canonical_key(hand_masks, board_mask, dead_mask))
+
+    def save(self, hand_masks, board_mask, dead_mask, result):
+        from .equity_cache import canonical_key
+        self.put(canonical_key(hand_masks, board_mask, dead_mask), result)
+
+    def save_many(self, spots):
+        from .equity_cache import canonical_key
+        return self.put_many((canonical_key(hand_masks, board_mask, dead_mask), result)
+                             for hand_masks, board_mask, dead_mask, result in spots)
+
+    def warm(self, lines, workers=None):
+        '''
+        function -- warm
+            fills the store from a query log, computing every spot that is not stored yet (on the worker pool)
+            spots that are the same up to suits are computed once -- the log is read as the results come in, only
+            a few spots per worker are in flight at a time, and the results are written every WARM_BATCH_SIZE spots
+        parameters: lines -- iterable of query lines in the batch.py format (invalid lines are skipped)
+                    workers -- number of worker processes (default keeps the running pool, or starts one
+                               per core; 1 computes in this process)
+        returns the number of results added
+        '''
+        from .batch import parse_query
+        from .card_codes import cards_to_mask
+        from .equity_cache import canonical_key
+        from .probabilities import count_runouts, get_equities, get_spot_masks
+
+        unwritten = set() # keys of spots being computed or waiting for their batch, which get cannot find yet
+        keys = deque() # keys of the spots being computed, in the order they were sent
+
+        def get_new_spots():
+            for line in lines:
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                try:
+                    _, hands, board, dead = parse_query(line)
+                    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                key = canonical_key(hand_masks, board_mask, cards_to_mask(dead))
+                if key not in unwritten and self.get(key) is None:
+                    unwritten.add(key)
+                    keys.append(key)
+                    yield hand_masks, board_mask, live_mask
+
+        if workers == 1:
+            all_counts = starmap(count_runouts, get_new_spots())
+        else:
+            from .parallel import map_in_order
+            all_counts = map_in_order(count_runouts, get_new_spots(), workers, WARM_TASKS_PER_WORKER)
+
+        added = 0
+        results = []
+        for counts in all_counts:
+            results.append((keys.popleft(), get_equities(*counts)))
+            if len(results) >= WARM_BATCH_SIZE:
+                added += self.put_many(results)
+                unwritten.difference_update(key for key, _ in results)
+                results = []
+        added += self.put_many(results)
+        self.evict()
+        return added
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self), 'maxsize': self.max_entries}
+
+    def clear(self):
+        self.connect().execute('DELETE FROM results')
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def __len__(self):
+        return self.connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+def encode_key(key):
+    '''
+    function -- encode key
+        converts a canonical key (tuple of ints) to the text stored in the database
+    parameters: key -- canonical key
+    returns the key as comma-separated text
+    '''
+    return ','.join(map(str, key))
+
+def use_store(path=STORE_PATH, max_entries=DEFAULT_MAX_ENTRIES, eviction='lru'):
+    '''
+    function -- use store
+        makes the equity entry points check a persistent store before enumerating and write their results back to
+        it -- probabilities.equity and equity_by_card (so the flop and turn of trajectory.equity_trajectory),
+        probabilities.equity_threshold (which only reads it, since it stops before the equities are exact),
+        parallel.equity_parallel, vectorized.equity_vectorized, equity_cache.cached_equity, batch.py and service.py
+        (probabilities.equity_outs also writes its equities, but always enumerates, since the hand categories are
+        not stored)
+    parameters: path -- file of the database (created if missing)
+                max_entries -- maximum number of results kept
+                eviction -- 'lru' or 'fifo' (see ResultStore)
+    returns the ResultStore now in use
+    '''
+    global default_store
+    stop_using_store()
+    default_store = ResultStore(path, max_entries, eviction)
+    return default_store
+
+def stop_using_store():
+    '''
+    function -- stop using store
+        stops the equity entry points from using the persistent store
+    parameters: none
+    returns nothing
+    '''
+    global default_store
+    if default_store is not None:
+        default_store.close()
+    default_store = None
@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import parse_query
+from .card_codes import cards_to_mask
+from .equity_cache import EquityCache, canonical_key
+from .parallel import get_pool
+from .preflop_table import lookup_counts
+from .probabilities import count_runouts, get_equities, get_spot_masks
+from . import result_store
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_PENDING = 64 # distinct computations queued or running before new ones are turned away
+DEFAULT_DEADLINE = 30.0 # seconds a request waits for its result unless it asks for a different deadline
+DEFAULT_MAX_OUTSTANDING = 256 # queries of one connection being answered before it is read no further
+
+class EquityService:
+    '''
+    Class EquityService
+        Represents a local equity server -- queries arrive one per line over TCP (the same JSON or compact text
+        format as batch.py, and a JSON query can add "deadline" in seconds), are computed on the shared worker
+        pool, and each result is written back as one line of JSON as soon as it is ready
+        a query for a spot that is already being computed (the same spot, or the same spot with the suits
+        relabelled) waits for that computation instead of starting another one
+
+    Attributes:
+        workers -- number of worker processes (default keeps the running pool, or starts one per core)
+        max_pending -- maximum number of distinct computations in flight; queries beyond it are rejected
+        default_deadline -- seconds a query waits for its result before it gets a timeout error
+        max_outstanding -- maximum number of queries of one connection being answered at a time; the connection is
+                           not read any further until one of them is answered, which holds the client back
+        cache -- EquityCache of finished results
+        store_executor -- single thread running the persistent store's reads and writes, so a slow SQLite call
+                          (waiting on another process's write, or an eviction) never stalls the event loop
+        stats -- dict counting queries served, computed, coalesced onto an in-flight computation, answered from
+                 the preflop table, answered from the cache, rejected and timed out
+
+    Methods:
+        __init__ -- constructor
+        get_equity -- coroutine computing one spot, coalescing it with an identical one in flight
+        finished -- hands a computation the pool is done with over to the event loop
+        finish -- stores a finished computation and stops coalescing queries onto it
+        handle_line -- coroutine answering one query line
+        handle_connection -- coroutine serving one client connection
+        serve -- coroutine running the server until it is cancelled
+    '''
+
+    def __init__(self, workers=None, max_pending=DEFAULT_MAX_PENDING, default_deadline=DEFAULT_DEADLINE, cache=None,
+                 max_outstanding=DEFAULT_MAX_OUTSTANDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.max_outstanding = max_outstanding
+        self.cache = EquityCache() if cache is None else cache
+        self.store_executor = ThreadPoolExecutor(max_workers=1)
+        self.stats = {'served': 0, 'computed': 0, 'coalesced': 0, 'table': 0, 'cached': 0, 'rejected': 0,
+                      'timed_out': 0}
+        # canonical key -> [pool future of the counts, asyncio future wrapping it, number of waiting queries]
+        self._in_flight = {}
+
+    async def get_equity(self, hands, board=(), dead=(), deadline=None):
+        '''
+        function -- get equity
+            computes the equities of a spot on the worker pool, waiting for an identical computation that is
+            already in flight instead of starting a second one (heads-up preflop spots are read from the preflop
+            table instead when it has been built)
+        parameters: hands -- list of each player's list of 2 hole cards
+                    board -- list of cards on the table
+                    dead -- list of known cards that are out of play
+                    deadline -- seconds to wait for the result (default is the service's default deadline)
+        returns the same list as probabilities.equity
+        raises ValueError if the spot is invalid or the service is at capacity,
+               asyncio.TimeoutError if the deadline passes first
+        '''
+        hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+        dead_mask = cards_to_mask(dead)
+        if len(hand_masks) == 2 and not board_mask and not dead_mask:
+            # a constant time read of a memory-mapped file, so it is answered right here on the event loop
+            counts = lookup_counts(hand_masks)
+            if counts is not None:
+                self.stats['table'] += 1
+                return get_equities(*counts)
+        key = canonical_key(hand_masks, board_mask, dead_mask)
+
+        result = self.cache.get(key)
+        store = result_store.default_store
+        if result is None and store is not None:
+            result = await asyncio.get_running_loop().run_in_executor(self.store_executor, store.get, key)
+            if result is not None:
+                self.cache.put(key, result)
+        if result is not None:
+            self.stats['cached'] += 1
+            return list(result)
+
+        entry = self._in_flight.get(key)
+        if entry is None or entry[0].cancelled():
+            if len(self._in_flight) >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise ValueError('Service is at capacity - please retry later')
+            loop = asyncio.get_running_loop()
+            pool_future = get_pool(self.workers).submit(count_runouts, hand_masks, board_mask, live_mask)
+            entry = [pool_future, asyncio.wrap_future(pool_future), 0]
+            self._in_flight[key] = entry
+            # the entry is only dropped once the pool is done with the computation, so max_pending keeps bounding
+            # the work queued or running in the pool even when every query waiting on it has given up
+            pool_future.add_done_callback(lambda _: self.finished(loop, key, entry))
+            self.stats['computed'] += 1
+        else:
+            self.stats['coalesced'] += 1
+
+        entry[2] += 1
+        try:
+            # shielded so a query that gives up does not cancel the computation other queries wait on
+            counts = await asyncio.wait_for(asyncio.shield(entry[1]),
+                                            self.default_deadline if deadline is None else deadline)
+        except asyncio.TimeoutError:
+            self.stats['timed_out'] += 1
+            raise
+        finally:
+            entry[2] -= 1
+            if entry[2] == 0:
+                # nobody is waiting any more, so drop the computation if it has not started yet
+                # (one that is already running cannot be stopped, and stays in flight until it finishes)
+                entry[0].cancel()
+        return get_equities(*counts)
+
+    def finished(self, loop, key, entry):
+        '''
+        function -- finished
+            hands a computation the pool is done with over to the event loop (called from the pool's thread)
+        parameters: loop -- event loop of the service
+                    key -- canonical key of the spot
+                    entry -- the in-flight entry of the computation
+        returns nothing
+        '''
+        try:
+            loop.call_soon_threadsafe(self.finish, key, entry)
+        except RuntimeError:
+            pass # the event loop has been closed, so the service has stopped
+
+    def finish(self, key, entry):
+        '''
+        function -- finish
+            stores a finished computation in the cache and stops coalescing queries onto it
+        parameters: key -- canonical key of the spot
+                    entry -- the in-flight entry of the computation
+        returns nothing
+        '''
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+        future = entry[0]
+        if not future.cancelled() and future.exception() is None:
+            result = tuple(get_equities(*future.result()))
+            self.cache.put(key, result)
+            store = result_store.default_store
+            if store is not None:
+                asyncio.get_running_loop().run_in_executor(self.store_executor, store.put, key, result)
+
+    async def handle_line(self, line, line_number):
+        '''
+        function -- handle line
+            parses and answers one query line
+        parameters: line -- text of the query
+                    line_number -- position of the query on its connection, used as its id if it has none
+        returns the result as one line of JSON -- the id with each player's win, tie and equity, or the error
+        '''
+        query_id = line_number
+        try:
+            parsed_id, hands, board, dead = parse_query(line)
+            if parsed_id is not None:
+                query_id = parsed_id
+            deadline = get_deadline(line)
+            results = await self.get_equity(hands, board, dead, deadline)
+        except asyncio.TimeoutError:
+            return json.dumps({'id': query_id, 'error': 'Deadline passed before the result was ready'})
+        except (ValueError, TypeError, AttributeError) as ex:
+            return json.dumps({'id': query_id, 'error': str(ex)})
+        finally:
+            self.stats['served'] += 1
+
+        return json.dumps({'id': query_id,
+                           'win': [win for win, _, _ in results],
+                           'tie': [tie for _, tie, _ in results],
+                           'equity': [player_equity for _, _, player_equity in results]})
+
+    async def handle_connection(self, reader, writer):
+        '''
+        function -- handle connection
+            serves one client -- every line is answered as soon as its result is ready, so results can arrive out
+            of order and are matched to queries by id (the line number unless the query gives one), and once
+            max_outstanding queries are being answered no more lines are read until one of them is
+        parameters: reader, writer -- the connection's asyncio streams
+        returns nothing
+        '''
+        async def answer(line, line_number):
+            try:
+                writer.write((await self.handle_line(line, line_number) + '\n').encode())
+            finally:
+                outstanding.release()
+
+        # queries coalesced onto a computation are not bounded by max_pending, so each connection bounds its own
+        outstanding = asyncio.Semaphore(self.max_outstanding)
+        tasks = set()
+        line_number = 0
+        try:
+            while True:
+                raw_line = await reader.readline()
+                if not raw_line:
+                    break
+                line_number += 1
+                line = raw_line.decode(errors='replace')
+                if line.strip() and not line.lstrip().startswith('#'):
+                    await outstanding.acquire()
+                    task = asyncio.create_task(answer(line, line_number))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            for task in list(tasks):
+                task.cancel()
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        '''
+        function -- serve
+            listens for connections until cancelled
+        parameters: host -- address to listen on (default is localhost only)
+                    port -- port to listen on
+        returns nothing
+        '''
+        # start the workers before listening, so forked workers do not inherit the server's sockets
+        # (a connection a worker holds open would never reach end of file for the client)
+        get_pool(self.workers).submit(int).result()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+def get_deadline(line):
+    '''
+    function -- get deadline
+        reads the optional "deadline" (in seconds) of a JSON query
+    parameters: line -- text of the query
+    returns the deadline, or None if the query does not give one
+    raises ValueError if the deadline is not a positive number
+    '''
+    if not line.lstrip().startswith('{'):
+        return None
+    deadline = json.loads(line).get('deadline')
+    if deadline is None:
+        return None
+    if not isinstance(deadline, (int, float)) or deadline <= 0:
+        raise ValueError(f'Invalid deadline - please provide a positive number of seconds: {deadline}')
+    return deadline
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve equity queries over TCP, one query per line.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on (default is localhost)')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help='distinct computations in flight before new queries are rejected')
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE,
+                        help='seconds a query waits for its result by default')
+    parser.add_argument('--max-outstanding', type=int, default=DEFAULT_MAX_OUTSTANDING,
+                        help='queries of one connection answered at a time before it is read no further')
+    parser.add_argument('--store', default=None, help='persistent result store (SQLite file) to read and fill')
+    args = parser.parse_args(argv)
+
+    if args.store:
+        result_store.use_store(args.store)
+    service = EquityService(args.workers, args.max_pending, args.deadline, max_outstanding=args.max_outstanding)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
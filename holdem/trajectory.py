@@ -0,0 +1,81 @@
+from itertools import chain, islice
+
+from .equity_cache import cached_equity
+from .probabilities import BOARD_TOTAL, count_runouts, equity_by_card, get_equities, get_spot_masks
+
+STREETS = ['preflop', 'flop', 'turn', 'river']
+STREET_BOARD_SIZES = [0, 3, 4, 5]
+HANDS_PER_TASK = 16 # hands sent to a worker at a time, so the pool is not contacted once per hand
+TASKS_PER_WORKER = 2 # tasks in flight per worker, bounds memory however many hands there are
+
+def equity_trajectory(hands, board, dead=()):
+    '''
+    function -- equity trajectory
+        determines each player's equity on every street of a hand, from preflop up to the last street dealt
+        the flop and turn equities come from one pass over the flop's runouts (the turn's equities are those
+        after the turn card that was actually dealt), heads-up preflop equities are read from the preflop table
+        when it has been built, and preflop equities are otherwise cached, so hands with the same preflop spot
+        (up to suits) only enumerate it once -- with a persistent store in use, the flop and turn are read from it
+        like in equity_by_card (the river is a single showdown, cheaper to evaluate than to look up)
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of the cards dealt on the table (0 to 5), in the order they were dealt
+                dead -- list of known cards that are out of play
+    returns a dict from each street reached ('preflop', 'flop', 'turn', 'river') to the equities as returned by
+            probabilities.equity (on the river, each player's actual result)
+    raises ValueError if the spot is invalid or the board has 1 or 2 cards
+    '''
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    if len(board) not in STREET_BOARD_SIZES:
+        raise ValueError('Invalid number of cards in community - please provide 0, 3, 4 or 5')
+
+    trajectory = {'preflop': cached_equity(hands, (), dead)}
+    if len(board) >= 3:
+        flop = list(board[:3])
+        flop_equities, next_card_equities = equity_by_card(hands, flop, dead)
+        trajectory['flop'] = flop_equities
+        if len(board) >= 4:
+            trajectory['turn'] = next_card_equities[board[3]]
+    if len(board) == BOARD_TOTAL:
+        trajectory['river'] = get_equities(*count_runouts(hand_masks, board_mask, live_mask))
+    return trajectory
+
+def run_trajectory(history):
+    '''
+    function -- run trajectory
+        computes the equity trajectory of one hand history, capturing an invalid history as its error
+    parameters: history -- (hands, board) or (hands, board, dead) tuple
+    returns the trajectory dict, or the error raised for the history (ValueError for an invalid spot, TypeError or
+            AttributeError for a history that is not made of the expected sequences of cards)
+    '''
+    try:
+        return equity_trajectory(*history)
+    except (ValueError, TypeError, AttributeError) as ex:
+        return ex
+
+def run_trajectories(histories):
+    '''
+    function -- run trajectories
+        computes the equity trajectories of a few hand histories in one task of the worker pool
+    parameters: histories -- list of (hands, board) or (hands, board, dead) tuples
+    returns the list of each history's trajectory dict or error (see run_trajectory)
+    '''
+    return [run_trajectory(history) for history in histories]
+
+def equity_trajectories(histories, workers=None):
+    '''
+    function -- equity trajectories
+        computes the equity trajectories of many hand histories, across the shared worker pool -- the histories are
+        read as the results come in, HANDS_PER_TASK per task with only a few tasks per worker in flight, so any
+        number of hands is handled in bounded memory
+        (each worker keeps its own preflop cache, so repeated preflop spots are enumerated once per worker)
+    parameters: histories -- iterable of (hands, board) or (hands, board, dead) tuples
+                workers -- number of worker processes (default keeps the running pool, or starts one per core;
+                           1 computes in this process)
+    returns an iterator over each history's trajectory dict (or the error raised for it), in input order
+    '''
+    if workers == 1:
+        return map(run_trajectory, histories)
+    from .parallel import map_in_order
+    histories = iter(histories)
+    tasks = iter(lambda: (list(islice(histories, HANDS_PER_TASK)),), ([],))
+    return chain.from_iterable(map_in_order(run_trajectories, tasks, workers, TASKS_PER_WORKER))
@@ -0,0 +1,176 @@
+from itertools import chain, combinations, islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .card_codes import NUM_VALUES, cards_to_mask, count_cards, mask_to_codes
+from .hand_functions import (ALL_RANKS_MASK, LOWEST_VALUE, POKER_HAND_TOTAL, RANK_SHIFT, RANK_COUNTS,
+                             STRAIGHT_HIGHS, TOP_FIVES, ROYAL_FLUSH, STRAIGHT_FLUSH, FOUR_OF_A_KIND,
+                             FULL_HOUSE, FLUSH, STRAIGHT, THREE_OF_A_KIND, TWO_PAIR, ONE_PAIR, HIGH_CARD)
+from .probabilities import BOARD_TOTAL, SPLIT_SCALE, count_runouts, count_total_runouts, get_spot_masks, stored_equity
+
+CHUNK_SIZE = 100000 # runouts evaluated per batch, bounds memory use on preflop spots
+MIN_RUNOUTS = 500 # below this many runouts (e.g. on the turn) the array set-up costs more than it saves, so the
+                  # runouts are counted by probabilities.count_runouts instead
+NUM_SUITS = 4
+
+_tables = None
+
+def get_tables():
+    '''
+    function -- get tables
+        converts the rank mask tables of hand_functions.py to NumPy arrays on first use
+    parameters: none
+    returns the rank count, straight high card, top five values and highest bit tables as int64 arrays
+    raises ImportError if NumPy is not installed
+    '''
+    global _tables
+    if np is None:
+        raise ImportError('The vectorized backend requires NumPy - please install it (pip install numpy)')
+    if _tables is None:
+        highest_bits = [max(mask.bit_length() - 1, 0) for mask in range(ALL_RANKS_MASK + 1)]
+        _tables = tuple(np.array(table, dtype=np.int64)
+                        for table in (RANK_COUNTS, STRAIGHT_HIGHS, TOP_FIVES, highest_bits))
+    return _tables
+
+def evaluate_suit_mask_arrays(diamonds, clubs, hearts, spades):
+    '''
+    function -- evaluate suit mask arrays
+        vectorized version of hand_functions.evaluate_suit_masks -- evaluates a whole batch of 5 to 7 card hands,
+        given as one array of rank masks per suit, with array operations
+    parameters: diamonds, clubs, hearts, spades -- int64 arrays of the rank masks held in each suit
+    returns an int64 array of packed strengths (same values as evaluate_suit_masks)
+    '''
+    rank_counts, straight_highs, top_fives, highest_bits = get_tables()
+
+    flush_masks = np.zeros_like(diamonds)
+    for suit_mask in (diamonds, clubs, hearts, spades):
+        flush_masks = np.where(rank_counts[suit_mask] >= POKER_HAND_TOTAL, suit_mask, flush_masks)
+    flush_highs = straight_highs[flush_masks]
+    flushes = np.where(flush_highs == 14, ROYAL_FLUSH << RANK_SHIFT | 14 << 16,
+                       np.where(flush_highs > 0, STRAIGHT_FLUSH << RANK_SHIFT | flush_highs << 16,
+                                FLUSH << RANK_SHIFT | top_fives[flush_masks]))
+
+    ranks = diamonds | clubs | hearts | spades
+    fours = diamonds & clubs & hearts & spades
+    threes = (diamonds & clubs & (hearts | spades)) | (hearts & spades & (diamonds | clubs))
+    twos = (diamonds & clubs) | (hearts & spades) | ((diamonds | clubs) & (hearts | spades))
+
+    four = highest_bits[fours]
+    quads = (FOUR_OF_A_KIND << RANK_SHIFT | (four + LOWEST_VALUE) << 16
+             | (top_fives[ranks & ~(1 << four)] >> 16) << 12)
+
+    three = highest_bits[threes]
+    full_house_pairs = twos & ~(1 << three)
+    full_houses = (FULL_HOUSE << RANK_SHIFT | (three + LOWEST_VALUE) << 16
+                   | (highest_bits[full_house_pairs] + LOWEST_VALUE) << 12)
+
+    straight_high = straight_highs[ranks]
+    straights = STRAIGHT << RANK_SHIFT | straight_high << 16
+
+    trips = (THREE_OF_A_KIND << RANK_SHIFT | (three + LOWEST_VALUE) << 16
+             | (top_fives[ranks & ~(1 << three)] >> 12) << 8)
+
+    pair = highest_bits[twos]
+    second_pairs = twos & ~(1 << pair)
+    second_pair = highest_bits[second_pairs]
+    two_pairs = (TWO_PAIR << RANK_SHIFT | (pair + LOWEST_VALUE) << 16 | (second_pair + LOWEST_VALUE) << 12
+                 | (top_fives[ranks & ~(1 << pair) & ~(1 << second_pair)] >> 16) << 8)
+    one_pairs = ONE_PAIR << RANK_SHIFT | (pair + LOWEST_VALUE) << 16 | (top_fives[ranks & ~(1 << pair)] >> 8) << 4
+
+    high_cards = HIGH_CARD << RANK_SHIFT | top_fives[ranks]
+
+    return np.select([flush_masks != 0,
+                      fours != 0,
+                      (threes != 0) & (full_house_pairs != 0),
+                      straight_high > 0,
+                      threes != 0,
+                      (twos != 0) & (second_pairs != 0),
+                      twos != 0],
+                     [flushes, quads, full_houses, straights, trips, two_pairs, one_pairs],
+                     default=high_cards)
+
+def get_runout_suit_masks(runout_codes):
+    '''
+    function -- get runout suit masks
+        converts a batch of runouts to one rank mask array per suit
+    parameters: runout_codes -- (number of runouts x cards per runout) array of card codes
+    returns a list of 4 int64 arrays, the rank masks each runout adds to each suit
+    '''
+    suits = runout_codes // NUM_VALUES
+    bits = np.left_shift(1, runout_codes % NUM_VALUES)
+    # cards in a runout are distinct, so summing the bits is the same as or-ing them
+    return [np.where(suits == suit, bits, 0).sum(axis=1) for suit in range(NUM_SUITS)]
+
+def count_runouts_vectorized(hand_masks, board_mask, live_mask, start=0, stop=None, chunk_size=CHUNK_SIZE):
+    '''
+    function -- count runouts vectorized
+        same as probabilities.count_runouts, evaluating the runouts in batches with NumPy instead of one by one
+        (fewer than MIN_RUNOUTS runouts are left to count_runouts, which is faster on so few)
+    parameters: hand_masks -- list of each player's hole card mask
+                board_mask -- mask of the cards on the table
+                live_mask -- mask of the cards that can still be dealt
+                start -- index of the first runout to count
+                stop -- index after the last runout to count (None for all remaining runouts)
+                chunk_size -- number of runouts evaluated per batch
+    returns lists of each player's wins, ties and pot shares (in 1/SPLIT_SCALE units), and the number of runouts
+    raises ImportError if NumPy is not installed
+    '''
+    get_tables()
+    num_runouts = count_total_runouts(board_mask, live_mask)
+    if min(num_runouts, num_runouts if stop is None else stop) - start < MIN_RUNOUTS:
+        return count_runouts(hand_masks, board_mask, live_mask, start, stop)
+    num_players = len(hand_masks)
+    wins = [0] * num_players
+    ties = [0] * num_players
+    shares = [0] * num_players
+    total = 0
+
+    player_suit_masks = []
+    for hand_mask in hand_masks:
+        player_mask = hand_mask | board_mask
+        player_suit_masks.append([player_mask >> (suit * NUM_VALUES) & ALL_RANKS_MASK for suit in range(NUM_SUITS)])
+
+    num_missing = BOARD_TOTAL - count_cards(board_mask)
+    runouts = islice(combinations(mask_to_codes(live_mask), num_missing), start, stop)
+
+    while True:
+        chunk = list(islice(runouts, chunk_size))
+        if not chunk:
+            break
+        runout_codes = np.fromiter(chain.from_iterable(chunk), dtype=np.int64,
+                                   count=len(chunk) * num_missing).reshape(len(chunk), num_missing)
+        runout_suit_masks = get_runout_suit_masks(runout_codes)
+
+        strengths = np.stack([evaluate_suit_mask_arrays(*[runout_suit_masks[suit] | suit_masks[suit]
+                                                          for suit in range(NUM_SUITS)])
+                              for suit_masks in player_suit_masks])
+        is_best = strengths == strengths.max(axis=0)
+        num_winners = is_best.sum(axis=0)
+        split_shares = SPLIT_SCALE // num_winners
+
+        for i in range(num_players):
+            wins[i] += int(np.count_nonzero(is_best[i] & (num_winners == 1)))
+            ties[i] += int(np.count_nonzero(is_best[i] & (num_winners > 1)))
+            shares[i] += int(split_shares[is_best[i]].sum())
+        total += len(chunk)
+
+    return wins, ties, shares, total
+
+def equity_vectorized(hands, board=(), dead=()):
+    '''
+    function -- equity vectorized
+        same as probabilities.equity, using the NumPy backend (worth it from the flop back -- the turn's few runouts
+        are counted by count_runouts, see MIN_RUNOUTS)
+    parameters: hands -- list of each player's list of 2 hole cards
+                board -- list of cards on the table
+                dead -- list of known cards that are out of play
+    returns a list with, for each player, the probability of winning outright, the probability of splitting
+            the pot, and the player's equity (identical to probabilities.equity, and read from the persistent
+            store the same way)
+    raises ValueError if the spot is invalid, ImportError if NumPy is not installed
+    '''
+    hand_masks, board_mask, live_mask = get_spot_masks(hands, board, dead)
+    return stored_equity(hand_masks, board_mask, live_mask, cards_to_mask(dead), count_runouts_vectorized)
@@ -0,0 +1,8 @@
+'''
+Script kept so `python lookup_table.py` keeps working from a checkout -- generates the hand evaluator's lookup table
+(see holdem/lookup_table.py)
+'''
+from holdem.lookup_table import main
+
+if __name__ == '__main__':
+    main()
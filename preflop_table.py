@@ -0,0 +1,8 @@
+'''
+Script kept so `python preflop_table.py` keeps working from a checkout -- builds the heads-up preflop equity table
+(see holdem/preflop_table.py)
+'''
+from holdem.preflop_table import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+'''
+Script kept so `python service.py` keeps working from a checkout -- serves equity queries over TCP
+(see holdem/service.py)
+'''
+from holdem.service import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from itertools import permutations
+
+import pytest
+
+from holdem.card_codes import parse_cards
+from holdem.equity_cache import EquityCache, cached_equity, get_spot_key
+from holdem.probabilities import equity
+
+def relabel(text, suits):
+    # suits maps each of 'dchs' to its new suit
+    return text.translate(str.maketrans('dchs', suits))
+
+def test_every_suit_relabelling_shares_a_key():
+    hands, board, dead = ['AhKh', 'QsQd', '7c6c'], '2h7h9c', '3d'
+    key = get_spot_key([parse_cards(hand) for hand in hands], parse_cards(board), parse_cards(dead))
+    for suits in permutations('dchs'):
+        suits = ''.join(suits)
+        assert get_spot_key([parse_cards(relabel(hand, suits)) for hand in hands], parse_cards(relabel(board, suits)),
+                            parse_cards(relabel(dead, suits))) == key
+
+def test_different_spots_do_not_share_a_key():
+    key = get_spot_key([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'))
+    # swapping players changes whose equity is whose
+    assert get_spot_key([parse_cards('QsQd'), parse_cards('AhKh')], parse_cards('2h7h9c')) != key
+    # the same ranks with a different suit structure
+    assert get_spot_key([parse_cards('AhKs'), parse_cards('QsQd')], parse_cards('2h7h9c')) != key
+    assert get_spot_key([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'), parse_cards('3c')) != key
+    assert get_spot_key([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h')) != key
+
+def test_lru_keeps_recently_used_results():
+    cache = EquityCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+def test_fifo_drops_the_oldest_result():
+    cache = EquityCache(maxsize=2, eviction='fifo')
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+def test_invalid_cache_settings():
+    with pytest.raises(ValueError):
+        EquityCache(maxsize=0)
+    with pytest.raises(ValueError):
+        EquityCache(eviction='random')
+
+def test_cached_equity_hits_on_relabelled_spots():
+    cache = EquityCache()
+    first = cached_equity([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'), cache=cache)
+    second = cached_equity([parse_cards('AsKs'), parse_cards('QhQc')], parse_cards('2s7s9d'), cache=cache)
+    assert first == second == equity([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'))
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,47 @@
+import pytest
+
+from holdem.card_codes import parse_cards
+from holdem.equity_counts import EquityCounts, count_shard, get_spot_shards, merge_counts
+from holdem.probabilities import equity
+
+HANDS = [parse_cards('AhKh'), parse_cards('QsQd')]
+BOARD = parse_cards('2h7h9c')
+
+def test_shards_merged_out_of_order_match_the_whole_enumeration():
+    shards = [count_shard(HANDS, BOARD, start=start, stop=stop)
+              for start, stop in get_spot_shards(HANDS, BOARD, num_shards=5)]
+    merged = merge_counts(reversed(shards))
+    assert merged.is_complete()
+    assert merged == count_shard(HANDS, BOARD)
+    assert merged.get_equities() == equity(HANDS, BOARD)
+
+def test_incomplete_shards_are_not_complete():
+    (start, stop), _, (last_start, last_stop) = get_spot_shards(HANDS, BOARD, num_shards=3)
+    merged = count_shard(HANDS, BOARD, start=start, stop=stop) + count_shard(HANDS, BOARD, start=last_start,
+                                                                             stop=last_stop)
+    assert not merged.is_complete()
+    assert merged.runout_ranges == [(start, stop), (last_start, last_stop)]
+
+def test_overlapping_shards_are_rejected():
+    with pytest.raises(ValueError):
+        count_shard(HANDS, BOARD, start=0, stop=500) + count_shard(HANDS, BOARD, start=400, stop=990)
+
+def test_counts_of_different_spots_are_rejected():
+    with pytest.raises(ValueError):
+        count_shard(HANDS, BOARD, stop=100) + count_shard(HANDS, parse_cards('2h7h9d'), start=100)
+
+def test_json_round_trip():
+    counts = count_shard(HANDS, BOARD, start=100, stop=600)
+    restored = EquityCounts.from_json(counts.to_json())
+    assert restored == counts
+    assert restored.runout_ranges == counts.runout_ranges
+    assert restored.num_runouts == counts.num_runouts
+    assert (restored + count_shard(HANDS, BOARD, stop=100) + count_shard(HANDS, BOARD, start=600)).is_complete()
+
+def test_range_shards_merge_to_the_whole_enumeration():
+    from holdem.ranges import count_range_runouts, get_range_shards
+    shards = [count_range_runouts('QQ+, AKs', '76s-54s', BOARD, start=start, stop=stop)
+              for start, stop in get_range_shards(BOARD, num_shards=4)]
+    merged = merge_counts(shards[::-1])
+    assert merged.is_complete()
+    assert merged == count_range_runouts('QQ+, AKs', '76s-54s', BOARD)
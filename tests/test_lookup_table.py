@@ -0,0 +1,39 @@
+import random
+
+from holdem import lookup_table, probabilities
+from holdem.card_codes import CARD_BITS, parse_cards
+from holdem.hand_functions import evaluate_mask
+from holdem.lookup_table import evaluate_mask_from_table, generate_table, get_table_evaluator, load_table
+
+def use_table(monkeypatch, path):
+    monkeypatch.setattr(lookup_table, '_table', load_table(path))
+    monkeypatch.setattr(lookup_table, '_table_loaded', True)
+
+def test_table_evaluators_match_evaluate_mask(tmp_path, monkeypatch):
+    path = str(tmp_path / 'hand_table.bin')
+    generate_table(path)
+    use_table(monkeypatch, path)
+    evaluate = get_table_evaluator()
+    rng = random.Random(7)
+    for _ in range(20000):
+        mask = sum(rng.sample(CARD_BITS, rng.choice([5, 6, 7])))
+        assert evaluate(mask) == evaluate_mask_from_table(mask) == evaluate_mask(mask)
+
+def test_enumeration_uses_the_table_when_generated(tmp_path, monkeypatch):
+    hands = [parse_cards('AhKh'), parse_cards('QsQd'), parse_cards('JcTc')]
+    board = parse_cards('2h7h9c')
+    monkeypatch.setattr(probabilities, '_evaluator', evaluate_mask)
+    expected = probabilities.equity(hands, board)
+
+    path = str(tmp_path / 'hand_table.bin')
+    generate_table(path)
+    use_table(monkeypatch, path)
+    monkeypatch.setattr(probabilities, '_evaluator', None)
+    assert probabilities.get_evaluator() is not evaluate_mask
+    assert probabilities.equity(hands, board) == expected
+
+def test_short_or_missing_file_is_not_a_table(tmp_path):
+    path = tmp_path / 'hand_table.bin'
+    assert load_table(str(path)) is None
+    path.write_bytes(b'HEV')
+    assert load_table(str(path)) is None
@@ -0,0 +1,29 @@
+from array import array
+
+from holdem import preflop_table
+from holdem.card_codes import card_to_code, parse_cards
+from holdem.equity_cache import EquityCache, cached_equity
+from holdem.preflop_table import NUM_HANDS, RUNOUTS_PER_MATCHUP, get_hand_index, lookup_equity
+from holdem.probabilities import equity
+
+HANDS = [parse_cards('AhKh'), parse_cards('QsQd')]
+
+def use_table(monkeypatch, wins, ties):
+    # a table holding only the test matchup, with counts no enumeration would give
+    counts = array('I', bytes(4 * 2 * NUM_HANDS * NUM_HANDS))
+    slot = (get_hand_index(*[card_to_code(card) for card in HANDS[0]]) * NUM_HANDS
+            + get_hand_index(*[card_to_code(card) for card in HANDS[1]]))
+    counts[2 * slot] = wins
+    counts[2 * slot + 1] = ties
+    monkeypatch.setattr(preflop_table, '_table', (memoryview(counts), None))
+    monkeypatch.setattr(preflop_table, '_table_loaded', True)
+
+def test_heads_up_preflop_equity_is_read_from_the_table(monkeypatch):
+    use_table(monkeypatch, 1000000, 12345)
+    expected = [(1000000 / RUNOUTS_PER_MATCHUP, 12345 / RUNOUTS_PER_MATCHUP,
+                 (1000000 + 12345 / 2) / RUNOUTS_PER_MATCHUP),
+                ((RUNOUTS_PER_MATCHUP - 1012345) / RUNOUTS_PER_MATCHUP, 12345 / RUNOUTS_PER_MATCHUP,
+                 (RUNOUTS_PER_MATCHUP - 1012345 + 12345 / 2) / RUNOUTS_PER_MATCHUP)]
+    assert lookup_equity(*HANDS) == expected
+    assert equity(HANDS) == expected
+    assert cached_equity(HANDS, cache=EquityCache()) == expected
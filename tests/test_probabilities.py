@@ -0,0 +1,59 @@
+import pytest
+
+from holdem.card_codes import FULL_DECK_MASK, cards_to_mask, parse_cards
+from holdem.probabilities import (MIN_SAMPLES, count_runouts, equity, equity_monte_carlo, equity_threshold,
+                                  get_runout_masks, get_spot_masks)
+
+def test_monte_carlo_lopsided_spot_does_not_stop_early():
+    # one player wins about 98% of the runouts, so early samples are often all wins
+    hands = [parse_cards('AhAs'), parse_cards('KcQd')]
+    board = parse_cards('Ad7c2s')
+    exact = equity(hands, board)[0][2]
+    for seed in range(10):
+        results, samples = equity_monte_carlo(hands, board, seed=seed)
+        assert samples >= MIN_SAMPLES
+        for _, std_error, (low, high) in results:
+            assert std_error > 0
+            assert low < high
+        assert abs(results[0][0] - exact) < 0.01
+
+def test_monte_carlo_rejects_no_samples():
+    with pytest.raises(ValueError):
+        equity_monte_carlo([parse_cards('AhAs'), parse_cards('KcQd')], max_samples=0)
+
+def test_threshold_equal_to_equity_is_reached():
+    hands = [parse_cards('Qc6h'), parse_cards('4cKc')]
+    board = parse_cards('Th8dQh')
+    for player in range(2):
+        player_equity = equity(hands, board)[player][2]
+        assert equity_threshold(hands, player_equity, board, player=player)[0]
+        assert not equity_threshold(hands, player_equity + 1e-9, board, player=player)[0]
+
+def test_runouts_from_start_match_the_full_order():
+    live_mask = FULL_DECK_MASK & ~cards_to_mask(parse_cards('AhKhQsQd'))
+    for num_missing in range(1, 6):
+        runouts = list(get_runout_masks(live_mask, num_missing, 0, 3000))
+        for start, stop in [(1, 5), (40, 1100), (1500, 1500), (2999, 3000)]:
+            assert list(get_runout_masks(live_mask, num_missing, start, stop)) == runouts[start:stop]
+
+def test_shard_counts_add_up_to_the_serial_counts():
+    hand_masks, board_mask, live_mask = get_spot_masks([parse_cards('AhKh'), parse_cards('QsQd')],
+                                                       parse_cards('2h7h9c'), [])
+    serial = count_runouts(hand_masks, board_mask, live_mask)
+    bounds = [0, 1, 200, 541, serial[3]]
+    shards = [count_runouts(hand_masks, board_mask, live_mask, start, stop)
+              for start, stop in zip(bounds, bounds[1:])]
+    for j in range(3):
+        assert [sum(shard[j][i] for shard in shards) for i in range(2)] == serial[j]
+    assert sum(shard[3] for shard in shards) == serial[3]
+
+def test_threshold_query_is_counted():
+    from holdem import instrumentation
+    instrumentation.enable()
+    try:
+        instrumentation.stats.reset()
+        _, seen = equity_threshold([parse_cards('AhAs'), parse_cards('KcQd')], 0.5, parse_cards('Ad7c2s'))
+        assert instrumentation.stats.queries == 1
+        assert instrumentation.stats.runouts == seen
+    finally:
+        instrumentation.disable()
@@ -0,0 +1,81 @@
+import pytest
+
+from holdem.card_codes import cards_to_mask, code_to_card, mask_to_codes, parse_cards
+from holdem.probabilities import equity
+from holdem.ranges import parse_range, parse_range_item, range_equity
+
+def hand(text):
+    return cards_to_mask(parse_cards(text))
+
+@pytest.mark.parametrize('item, num_combos', [
+    ('QQ', 6), ('AKs', 4), ('AKo', 12), ('AK', 16), ('ak', 16),
+    ('QQ+', 18), ('22+', 78), ('A5s+', 36), ('K9o+', 48),
+    ('QQ-99', 24), ('99-QQ', 24), ('A9s-A6s', 16), ('76s-54s', 12), ('T9o-T8o', 24), ('AhKh', 1)])
+def test_item_sizes(item, num_combos):
+    combos = parse_range_item(item)
+    assert len(combos) == len(set(combos)) == num_combos
+
+def test_items_expand_to_the_right_classes():
+    assert parse_range_item('A5s+') == [combo for kicker in '56789TJQK'
+                                        for combo in parse_range_item('A' + kicker + 's')]
+    assert set(parse_range_item('76s-54s')) == set(parse_range_item('76s') + parse_range_item('65s')
+                                                   + parse_range_item('54s'))
+    assert set(parse_range_item('A9s-A6s')) == set(parse_range_item('A6s') + parse_range_item('A7s')
+                                                   + parse_range_item('A8s') + parse_range_item('A9s'))
+    assert set(parse_range_item('QQ+')) == set(parse_range_item('QQ') + parse_range_item('KK') + parse_range_item('AA'))
+    assert all(mask in parse_range_item('AK') for mask in parse_range_item('AKo') + parse_range_item('AKs'))
+    assert set(parse_range_item('AKs')) == {hand('AdKd'), hand('AcKc'), hand('AhKh'), hand('AsKs')}
+
+@pytest.mark.parametrize('item', ['AAs', 'AKx', 'A', 'AKs-QJo', 'AKs-QTs', 'ZZ', 'AhAh', 'XhKh', 'QQ-AKs', ''])
+def test_invalid_items(item):
+    with pytest.raises(ValueError):
+        parse_range_item(item)
+
+def test_weights_and_later_items_override():
+    weights = parse_range('AK, AhKh:0.25, QQ:0.5, QsQd:0')
+    assert len(weights) == 16 + 5
+    assert weights[hand('AhKh')] == 0.25
+    assert weights[hand('AsKd')] == 1.0
+    assert weights[hand('QhQc')] == 0.5
+    assert hand('QsQd') not in weights
+    assert parse_range('AhKh:0.25, AK')[hand('AhKh')] == 1.0
+
+def test_invalid_weight():
+    with pytest.raises(ValueError):
+        parse_range('AK:-1')
+    with pytest.raises(ValueError):
+        parse_range('AK:half')
+
+def test_blocked_combos_are_removed():
+    board = parse_cards('Ah7c2d')
+    # the Ah on the board blocks AhKh, which leaves KK against QQ
+    results = range_equity('AhKh, KK', 'QQ', board)
+    assert results == range_equity('KK', 'QQ', board)
+    with pytest.raises(ValueError):
+        range_equity('AhKh', 'QQ', board)
+    with pytest.raises(ValueError):
+        range_equity('KhKs', 'KhKd', parse_cards('2c3c4c'))
+
+def test_range_equity_matches_the_weighted_average_of_every_matchup():
+    range_1 = 'JJ+, AKs:0.5, KhQh'
+    range_2 = 'TT, AhKh:0.25, AK:0.75, QQ:0.4'
+    board = parse_cards('Kc8h3s2d')
+    weights_1 = parse_range(range_1)
+    weights_2 = parse_range(range_2)
+    board_mask = cards_to_mask(board)
+    totals = [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+    total_weight = 0.0
+    for mask_1, weight_1 in weights_1.items():
+        for mask_2, weight_2 in weights_2.items():
+            if mask_1 & mask_2 or (mask_1 | mask_2) & board_mask:
+                continue
+            hands = [[code_to_card(code) for code in mask_to_codes(mask)] for mask in (mask_1, mask_2)]
+            weight = weight_1 * weight_2
+            for player, results in enumerate(equity(hands, board)):
+                for j in range(3):
+                    totals[player][j] += weight * results[j]
+            total_weight += weight
+
+    for player, results in enumerate(range_equity(range_1, range_2, board)):
+        for j in range(3):
+            assert results[j] == pytest.approx(totals[player][j] / total_weight)
@@ -0,0 +1,69 @@
+import pytest
+
+from holdem import probabilities, result_store
+from holdem.card_codes import cards_to_mask, parse_cards
+from holdem.equity_cache import canonical_key
+from holdem.probabilities import equity, equity_by_card, equity_threshold
+from holdem.result_store import ResultStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = result_store.use_store(str(tmp_path / 'results.sqlite3'))
+    yield store
+    result_store.stop_using_store()
+
+def get_key(hands, board=''):
+    return canonical_key([cards_to_mask(parse_cards(hand)) for hand in hands], cards_to_mask(parse_cards(board)))
+
+def test_suit_relabelled_spot_is_a_hit(store, monkeypatch):
+    first = equity([parse_cards('AhKh'), parse_cards('QsQd')], parse_cards('2h7h9c'))
+    # the same spot with hearts and spades swapped must not be enumerated again
+    monkeypatch.setattr(probabilities, 'count_runouts', None)
+    assert equity([parse_cards('AsKs'), parse_cards('QhQd')], parse_cards('2s7s9c')) == first
+    assert store.hits == 1
+    assert len(store) == 1
+
+def test_equity_by_card_round_trip(store, monkeypatch):
+    hands = [parse_cards('AhKh'), parse_cards('QsQd')]
+    board = parse_cards('2h7h9c')
+    results, next_card_equities = equity_by_card(hands, board)
+    # next cards that are the same up to suits share a stored result
+    hand_masks = [cards_to_mask(hand) for hand in hands]
+    keys = {canonical_key(hand_masks, cards_to_mask(board + [card])) for card in next_card_equities}
+    assert len(store) == 1 + len(keys)
+
+    def fail(*args):
+        raise AssertionError('enumerated a stored spot')
+    monkeypatch.setattr(probabilities, 'count_runouts_by_card', fail)
+    assert equity_by_card(hands, board) == (results, next_card_equities)
+
+def test_eviction_down_to_max_entries(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite3'), max_entries=10, eviction='fifo')
+    store.put_many((('spot', i), ((0.5, 0.0, 0.5),)) for i in range(25))
+    assert len(store) == 25 # put_many only checks the size every EVICTION_CHECK_INTERVAL writes
+    assert store.evict() == 15
+    assert len(store) == 10
+    assert store.get(('spot', 0)) is None
+    assert store.get(('spot', 24)) is not None
+    store.close()
+
+def test_warm_skips_stored_spots(store):
+    lines = ['AhKh QsQd | 2h7h9c',
+             'AsKs QhQd | 2s7s9c', # the first spot with suits relabelled
+             '# a comment',
+             'not a query',
+             'AhKh QsQd | 2h7h9c | 3c',
+             'AhKh QsQd | 2h7h9c8d']
+    assert store.warm(lines[:1], workers=1) == 1
+    assert store.warm(lines, workers=1) == 2
+    assert store.warm(lines, workers=1) == 0
+    assert store.get(get_key(['AhKh', 'QsQd'], '2h7h9c8d')) == tuple(equity([parse_cards('AhKh'), parse_cards('QsQd')],
+                                                                            parse_cards('2h7h9c8d')))
+
+def test_threshold_reads_a_stored_spot(store):
+    hands = [parse_cards('Qc6h'), parse_cards('4cKc')]
+    board = parse_cards('Th8dQh')
+    player_equity = equity(hands, board)[1][2]
+    assert equity_threshold(hands, player_equity, board, player=1) == (True, 0)
+    assert equity_threshold(hands, player_equity + 1e-9, board, player=1) == (False, 0)
+    assert store.hits == 2
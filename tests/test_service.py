@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from holdem import service
+from holdem.card_codes import parse_cards
+from holdem.probabilities import count_runouts, equity
+from holdem.service import EquityService
+
+HANDS = [parse_cards('AhKh'), parse_cards('QsQd')]
+BOARD = parse_cards('2h7h9c')
+
+@pytest.fixture
+def release(monkeypatch):
+    # computations run on threads and wait until the test releases them
+    released = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=4)
+
+    def held_count(*masks):
+        released.wait(5)
+        return count_runouts(*masks)
+
+    monkeypatch.setattr(service, 'get_pool', lambda workers=None: executor)
+    monkeypatch.setattr(service, 'count_runouts', held_count)
+    yield released
+    released.set()
+    executor.shutdown()
+
+def test_relabelled_spots_coalesce_onto_one_computation(release):
+    async def run():
+        equity_service = EquityService()
+        first = asyncio.create_task(equity_service.get_equity(HANDS, BOARD))
+        second = asyncio.create_task(equity_service.get_equity([parse_cards('AsKs'), parse_cards('QhQd')],
+                                                               parse_cards('2s7s9c')))
+        await asyncio.sleep(0.05)
+        release.set()
+        return equity_service, await first, await second
+
+    equity_service, first, second = asyncio.run(run())
+    assert first == second == equity(HANDS, BOARD)
+    assert equity_service.stats['computed'] == 1
+    assert equity_service.stats['coalesced'] == 1
+
+def test_distinct_spots_beyond_max_pending_are_rejected(release):
+    async def run():
+        equity_service = EquityService(max_pending=1)
+        first = asyncio.create_task(equity_service.get_equity(HANDS, BOARD))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ValueError):
+            await equity_service.get_equity(HANDS, parse_cards('2h7h9d'))
+        release.set()
+        await first
+        return equity_service
+
+    assert asyncio.run(run()).stats['rejected'] == 1
+
+def test_deadline_expires_but_the_computation_finishes(release):
+    async def run():
+        equity_service = EquityService()
+        with pytest.raises(asyncio.TimeoutError):
+            await equity_service.get_equity(HANDS, BOARD, deadline=0.05)
+        assert len(equity_service._in_flight) == 1 # the computation had started, so it runs to the end
+        release.set()
+        for _ in range(100):
+            if not equity_service._in_flight:
+                break
+            await asyncio.sleep(0.01)
+        return equity_service, await equity_service.get_equity(HANDS, BOARD)
+
+    equity_service, result = asyncio.run(run())
+    assert result == equity(HANDS, BOARD)
+    assert equity_service.stats['timed_out'] == 1
+    assert equity_service.stats['cached'] == 1
+
+def test_outstanding_queries_per_connection_are_bounded():
+    num_queries = 20
+    active = 0
+    max_active = 0
+
+    async def run():
+        equity_service = EquityService(max_outstanding=3)
+
+        async def slow_get_equity(hands, board=(), dead=(), deadline=None):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return [(1.0, 0.0, 1.0), (0.0, 0.0, 0.0)]
+
+        equity_service.get_equity = slow_get_equity
+        server = await asyncio.start_server(equity_service.handle_connection, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(''.join('AhKh QsQd\n' for _ in range(num_queries)).encode())
+            writer.write_eof()
+            answers = [line async for line in reader]
+            writer.close()
+        return answers
+
+    answers = asyncio.run(run())
+    assert len(answers) == num_queries
+    assert max_active == 3